@@ -10,37 +10,34 @@ Usage:
 3. Run the script to generate an Anki deck (.apkg file)
 """
 
-import genanki
-import random
-import re
-from deep_translator import GoogleTranslator
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
+from multiLanguageDecksMaker import BilingualAnkiDeckGenerator, model_id
+from translationCache import DEFAULT_CACHE_FILE
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt_tab')
-except LookupError:
-    nltk.download('punkt_tab')
 
-class RussianAnkiDeckGenerator:
-    def __init__(self, input_file, output_file="russian_deck.apkg"):
-        self.input_file = input_file
-        self.output_file = output_file
-        self.translator = GoogleTranslator(source='ru', target='en')
-        self.deck_id = random.randrange(1 << 30, 1 << 31)
-        self.deck = genanki.Deck(self.deck_id, 'Russian Learning Deck')
+class RussianAnkiDeckGenerator(BilingualAnkiDeckGenerator):
+    """Russian -> English preset of BilingualAnkiDeckGenerator with its own note models"""
+
+    def __init__(self, input_file, output_file="russian_deck.apkg", cache_file=DEFAULT_CACHE_FILE,
+                 **options):
+        # options: any other BilingualAnkiDeckGenerator setting, e.g. workers=4
+        super().__init__(input_file, source_lang='ru', target_lang='en',
+                         deck_name='Russian Learning Deck', output_file=output_file,
+                         cache_file=cache_file, **options)
+        import genanki
         
         # Model for Russian -> English cards
+        ru_en_fields = [
+            {'name': 'Russian'},
+            {'name': 'Example'},
+            {'name': 'English'},
+            {'name': 'EnglishExample'},
+        ]
+        extra_fields = self.forms_fields() + self.audio_fields()
+        ru_en_fields += extra_fields
         self.model_ru_en = genanki.Model(
-            random.randrange(1 << 30, 1 << 31),
+            model_id('Russian to English Model', extra_fields=extra_fields),
             'Russian to English Model',
-            fields=[
-                {'name': 'Russian'},
-                {'name': 'Example'},
-                {'name': 'English'},
-                {'name': 'EnglishExample'},
-            ],
+            fields=ru_en_fields,
             templates=[
                 {
                     'name': 'Card 1',
@@ -49,23 +46,25 @@ class RussianAnkiDeckGenerator:
                               <div style="font-size: 18px; margin-top: 20px;">{{Example}}</div>
                               <div style="margin-top: 20px;">
                                 <a href="https://conjugator.reverso.net/conjugation-russian-verb-{{Russian}}.html" target="_blank">Conjugation</a>
-                              </div>''',
+                              </div>''' + self.audio_template(),
                     'afmt': '''{{FrontSide}}
                               <hr id="answer">
                               <div style="font-size: 24px; color: blue; text-align: center;">{{English}}</div>
-                              <div style="font-size: 18px; margin-top: 20px;">{{EnglishExample}}</div>''',
+                              <div style="font-size: 18px; margin-top: 20px;">{{EnglishExample}}</div>''' + self.forms_template(),
                 },
             ])
+        self.model_src_tgt = self.model_ru_en
         
         # Model for English -> Russian cards
+        en_ru_fields = [
+            {'name': 'English'},
+            {'name': 'Russian'},
+            {'name': 'Example'},
+        ]
         self.model_en_ru = genanki.Model(
-            random.randrange(1 << 30, 1 << 31),
+            model_id('English to Russian Model'),
             'English to Russian Model',
-            fields=[
-                {'name': 'English'},
-                {'name': 'Russian'},
-                {'name': 'Example'},
-            ],
+            fields=en_ru_fields,
             templates=[
                 {
                     'name': 'Card 1',
@@ -79,16 +78,18 @@ class RussianAnkiDeckGenerator:
                               </div>''',
                 },
             ])
+        self.model_tgt_src = self.model_en_ru
         
         # Model for fill-in-the-blank cards
+        cloze_fields = [
+            {'name': 'RussianSentence'},
+            {'name': 'EnglishSentence'},
+            {'name': 'MissingWord'},
+        ]
         self.model_cloze = genanki.Model(
-            random.randrange(1 << 30, 1 << 31),
+            model_id('Russian Cloze Model'),
             'Russian Cloze Model',
-            fields=[
-                {'name': 'RussianSentence'},
-                {'name': 'EnglishSentence'},
-                {'name': 'MissingWord'},
-            ],
+            fields=cloze_fields,
             templates=[
                 {
                     'name': 'Card 1',
@@ -101,153 +102,13 @@ class RussianAnkiDeckGenerator:
                 },
             ])
 
-    def read_text(self):
-        """Read Russian text from file"""
-        with open(self.input_file, 'r', encoding='utf-8') as f:
-            return f.read()
-
-    def extract_words_from_sentence(self, sentence):
-        """Extract words from a single sentence"""
-        words = word_tokenize(sentence, language='russian')
-        clean_words = []
-        for word in words:
-            # Clean word and filter out punctuation
-            clean_word = re.sub(r'[^\w]', '', word).lower()
-            if len(clean_word) > 2 and clean_word.isalpha():
-                clean_words.append((clean_word, word))  # (cleaned, original)
-        return clean_words
-
-    def translate_text(self, text):
-        """Translate Russian text to English"""
-        try:
-            # Split long texts into chunks (Google Translate has limits)
-            if len(text) > 500:
-                return self.translator.translate(text[:500]) + "..."
-            return self.translator.translate(text)
-        except Exception as e:
-            print(f"Translation error: {e}")
-            return "[Translation Error]"
-
-    def create_cards_for_word(self, russian_word, sentence):
-        """Create all three card types for a single word"""
-        try:
-            # Translate word and sentence
-            english_word = self.translate_text(russian_word)
-            english_sentence = self.translate_text(sentence)
-            
-            # 1. Russian -> English card
-            note_ru_en = genanki.Note(
-                model=self.model_ru_en,
-                fields=[russian_word, sentence, english_word, english_sentence],
-                tags=['russian', 'vocabulary']
-            )
-            
-            # 2. English -> Russian card
-            note_en_ru = genanki.Note(
-                model=self.model_en_ru,
-                fields=[english_word, russian_word, sentence],
-                tags=['russian', 'vocabulary', 'reverse']
-            )
-            
-            # 3. Cloze card - find the word in sentence and replace with [...]
-            # Try to find the original word form in the sentence
-            words_in_sentence = word_tokenize(sentence, language='russian')
-            word_to_replace = None
-            for w in words_in_sentence:
-                if re.sub(r'[^\w]', '', w).lower() == russian_word:
-                    word_to_replace = w
-                    break
-            
-            if word_to_replace:
-                sentence_with_blank = sentence.replace(word_to_replace, '[...]', 1)
-                english_with_bold = english_sentence.replace(
-                    english_word, f"<b>{english_word}</b>", 1
-                )
-                
-                note_cloze = genanki.Note(
-                    model=self.model_cloze,
-                    fields=[sentence_with_blank, english_with_bold, russian_word],
-                    tags=['russian', 'cloze', 'exercise']
-                )
-            else:
-                note_cloze = None
-            
-            return note_ru_en, note_en_ru, note_cloze
-            
-        except Exception as e:
-            print(f"Error creating cards for '{russian_word}': {e}")
-            return None, None, None
-
-    def generate_deck(self):
-        """Main method to generate the Anki deck"""
-        print("Reading text file...")
-        text = self.read_text()
-        
-        print("Tokenizing sentences...")
-        sentences = sent_tokenize(text, language='russian')
-        print(f"Found {len(sentences)} sentences")
-        
-        # Track words we've already seen
-        seen_words = set()
-        total_cards = 0
-        
-        # Process each sentence one by one
-        for i, sentence in enumerate(sentences):
-            print(f"\nProcessing sentence {i+1}/{len(sentences)}: {sentence[:50]}...")
-            
-            # Extract words from this sentence
-            words_in_sentence = self.extract_words_from_sentence(sentence)
-            
-            # Find NEW words (not seen before)
-            new_words = []
-            for clean_word, original_word in words_in_sentence:
-                if clean_word not in seen_words:
-                    new_words.append(clean_word)
-                    seen_words.add(clean_word)
-            
-            if not new_words:
-                print(f"  No new words in this sentence, skipping...")
-                continue
-            
-            print(f"  Found {len(new_words)} new word(s): {', '.join(new_words)}")
-            
-            # Collect all cards for this sentence
-            ru_en_cards = []
-            en_ru_cards = []
-            cloze_cards = []
-            
-            for word in new_words:
-                ru_en_card, en_ru_card, cloze_card = self.create_cards_for_word(word, sentence)
-                
-                if ru_en_card:
-                    ru_en_cards.append(ru_en_card)
-                if en_ru_card:
-                    en_ru_cards.append(en_ru_card)
-                if cloze_card:
-                    cloze_cards.append(cloze_card)
-            
-            # Add cards in proper learning order:
-            # First all Russian -> English
-            for card in ru_en_cards:
-                self.deck.add_note(card)
-                total_cards += 1
-            
-            # Then all English -> Russian
-            for card in en_ru_cards:
-                self.deck.add_note(card)
-                total_cards += 1
-            
-            # Finally all Cloze cards
-            for card in cloze_cards:
-                self.deck.add_note(card)
-                total_cards += 1
-        
-        print(f"\n{'='*50}")
-        print(f"Saving deck to {self.output_file}...")
-        genanki.Package(self.deck).write_to_file(self.output_file)
-        print(f"Done! Deck created successfully.")
-        print(f"Total unique words: {len(seen_words)}")
-        print(f"Total cards created: {total_cards}")
+    def note_tags(self, kind):
+        """Return the tags for a note of the given kind (forward, reverse or cloze)"""
+        if kind == 'cloze':
+            return ['russian', 'cloze', 'exercise']
+        if kind == 'reverse':
+            return ['russian', 'vocabulary', 'reverse']
+        return ['russian', 'vocabulary']
 
 
 if __name__ == "__main__":
@@ -255,5 +116,6 @@ if __name__ == "__main__":
     input_file = "russian_text.txt"  # Change this to your file path
     output_file = "russian_deck.apkg"
     
-    generator = RussianAnkiDeckGenerator(input_file, output_file)
+    # The example text is short, so show every sentence instead of a progress line
+    generator = RussianAnkiDeckGenerator(input_file, output_file, verbose=True)
     generator.generate_deck()
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+Bulk .apkg Writer
+
+Writes notes straight into the collection SQLite database as they are
+produced, instead of keeping every genanki.Note in the deck until
+genanki.Package.write_to_file serializes them one by one at the end.
+
+The collection, deck and note types are still created by genanki itself;
+only the notes and cards are inserted here, in batches with executemany
+inside one transaction. close() zips the database (and media files) into
+the .apkg, exactly like genanki does. The database is built in
+<output>.anki2.tmp, so one left behind by a killed run is replaced by the
+next one.
+"""
+
+import itertools
+import json
+import os
+import sqlite3
+import time
+import zipfile
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+class ApkgWriter:
+    def __init__(self, deck, models, output_file, batch_size=DEFAULT_BATCH_SIZE):
+        import genanki
+
+        self.deck = deck
+        self.output_file = output_file
+        self.batch_size = batch_size
+        self.timestamp = time.time()
+        self.id_gen = itertools.count(int(self.timestamp * 1000))
+        self.notes = 0
+        self.cards = 0
+        self._note_rows = []
+        self._card_rows = []
+
+        # The database is built next to the output file and zipped on close
+        self.db_path = output_file + '.anki2.tmp'
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute('PRAGMA journal_mode = OFF')
+        self.conn.execute('PRAGMA synchronous = OFF')
+        cursor = self.conn.cursor()
+
+        # Schema, collection, deck and note types exactly as genanki writes them
+        for model in models:
+            deck.add_model(model)
+        genanki.Package(deck).write_to_db(cursor, self.timestamp, self.id_gen)
+
+    def add_note(self, note):
+        """Queue a genanki.Note (and its cards) for insertion"""
+        if len(note.fields) != len(note.model.fields):
+            raise ValueError(f"Note has {len(note.fields)} fields, "
+                             f"model {note.model.name} has {len(note.model.fields)}")
+
+        note_id = next(self.id_gen)
+        modified = int(self.timestamp)
+        self._note_rows.append((
+            note_id,                             # id
+            note.guid,                           # guid
+            note.model.model_id,                 # mid
+            modified,                            # mod
+            -1,                                  # usn
+            ' ' + ' '.join(note.tags) + ' ',     # tags
+            '\x1f'.join(note.fields),            # flds
+            note.sort_field,                     # sfld
+            0,                                   # csum
+            0,                                   # flags
+            '',                                  # data
+        ))
+        for card in note.cards:
+            self._card_rows.append((
+                next(self.id_gen),               # id
+                note_id,                         # nid
+                self.deck.deck_id,               # did
+                card.ord,                        # ord
+                modified,                        # mod
+                -1,                              # usn
+                0,                               # type
+                -1 if card.suspend else 0,       # queue
+                0, 0, 0, 0, 0, 0, 0, 0, 0,       # due, ivl, factor, reps, lapses, left, odue, odid, flags
+                '',                              # data
+            ))
+            self.cards += 1
+        self.notes += 1
+
+        if len(self._note_rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Insert the queued notes and cards"""
+        if self._note_rows:
+            self.conn.executemany('INSERT INTO notes VALUES (?,?,?,?,?,?,?,?,?,?,?)', self._note_rows)
+            self._note_rows = []
+        if self._card_rows:
+            self.conn.executemany('INSERT INTO cards VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)',
+                                  self._card_rows)
+            self._card_rows = []
+
+    def close(self, media_files=()):
+        """Write the remaining notes and zip everything into the .apkg file"""
+        try:
+            self.flush()
+            self.conn.commit()
+            self.conn.close()
+
+            media = dict(enumerate(media_files))
+            with zipfile.ZipFile(self.output_file, 'w') as outzip:
+                outzip.write(self.db_path, 'collection.anki2')
+                outzip.writestr('media', json.dumps(
+                    {index: os.path.basename(path) for index, path in media.items()}))
+                for index, path in media.items():
+                    outzip.write(path, str(index))
+        finally:
+            os.remove(self.db_path)
+
+    def discard(self):
+        """Delete the database without writing the .apkg file"""
+        self.conn.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
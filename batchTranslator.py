@@ -0,0 +1,170 @@
+"""
+Batch Translator
+
+Packs many short texts (words and sentences) into as few translator
+requests as possible. Texts are joined with a newline, sent as one request
+up to the backend's character limit, and the result is split back on
+newlines. When the number of returned lines does not match, the batch is
+translated again one text at a time, so results never get misaligned.
+Backends with a batch endpoint (translate_many) get the list of texts
+instead of newline-joined text.
+
+Texts longer than the limit are split at sentence or word boundaries and
+translated chunk by chunk instead of being truncated.
+
+A BatchTranslator can be shared by several threads; an optional TokenBucket
+limits the request rate and throttled requests are retried with backoff.
+"""
+
+import re
+import threading
+import time
+from rateLimiter import call_with_retry
+
+# deep_translator's GoogleTranslator rejects texts of 5000 characters or more
+DEFAULT_MAX_CHARS = 4500
+DELIMITER = '\n'
+
+
+def split_text(text, max_chars=DEFAULT_MAX_CHARS):
+    """Split text into chunks of at most max_chars, preferring sentence boundaries"""
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks = []
+    current = ''
+    # Sentences first, then words for sentences that are still too long
+    for sentence in re.split(r'(?<=[.!?…;])\s+', text):
+        pieces = [sentence] if len(sentence) <= max_chars else sentence.split(' ')
+        for piece in pieces:
+            while len(piece) > max_chars:
+                # A single "word" longer than the limit, cut it hard
+                if current:
+                    chunks.append(current)
+                    current = ''
+                chunks.append(piece[:max_chars])
+                piece = piece[max_chars:]
+            candidate = f"{current} {piece}" if current else piece
+            if len(candidate) <= max_chars:
+                current = candidate
+            else:
+                chunks.append(current)
+                current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class BatchTranslator:
+    def __init__(self, translator, max_chars=DEFAULT_MAX_CHARS, max_failures=3,
+                 rate_limiter=None, retries=3, backoff=1.0, metrics=None):
+        self.translator = translator
+        self.max_chars = max_chars
+        self.rate_limiter = rate_limiter
+        self.retries = retries
+        self.backoff = backoff
+        # Optional metrics.Metrics for request counts, characters, latency and errors
+        self.metrics = metrics
+        # Stop packing after this many misaligned batches in a row
+        self.max_failures = max_failures
+        self.packing_enabled = True
+        self.requests = 0
+        self._failures = 0
+        self._lock = threading.Lock()
+
+    def _batch_backend(self):
+        """Return the backend if it can translate a list of texts in one request, else None"""
+        backend = getattr(self.translator, 'backend', self.translator)
+        return backend if hasattr(backend, 'translate_many') else None
+
+    def _request(self, text):
+        """Send one request: a text, or a list of texts to a backend with a batch endpoint"""
+        def send():
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            with self._lock:
+                self.requests += 1
+            start = time.perf_counter()
+            try:
+                if isinstance(text, list):
+                    return self._batch_backend().translate_many(text)
+                return self.translator.translate(text)
+            except Exception:
+                self._count('translation_request_errors')
+                raise
+            finally:
+                if self.metrics:
+                    self.metrics.observe('translation_request_seconds', time.perf_counter() - start)
+                    self.metrics.count('translation_requests')
+                    self.metrics.count('translation_chars',
+                                       sum(map(len, text)) if isinstance(text, list) else len(text))
+        return call_with_retry(send, self.retries, self.backoff)
+
+    def _count(self, name):
+        if self.metrics:
+            self.metrics.count(name)
+
+    def translate(self, text):
+        """Translate a single text, chunking it if it exceeds the character limit"""
+        text = re.sub(r'\s+', ' ', text).strip()
+        return ' '.join(self._request(chunk) for chunk in split_text(text, self.max_chars))
+
+    def translate_batch(self, texts):
+        """Translate a list of texts, returning None for texts that failed"""
+        texts = [re.sub(r'\s+', ' ', text).strip() for text in texts]
+        results = [None] * len(texts)
+
+        for indices in self._pack(texts):
+            if len(indices) > 1 and self.packing_enabled:
+                translated = self._translate_packed([texts[i] for i in indices])
+                if translated is not None:
+                    for i, translation in zip(indices, translated):
+                        results[i] = translation
+                    continue
+
+            # Single text, or the packed request could not be aligned
+            for i in indices:
+                try:
+                    results[i] = self.translate(texts[i])
+                except Exception as e:
+                    self._count('translation_failed_units')
+                    print(f"Translation error: {e}")
+        return results
+
+    def _pack(self, texts):
+        """Group text indices so each group fits into one request"""
+        group = []
+        size = 0
+        for i, text in enumerate(texts):
+            length = len(text) + len(DELIMITER)
+            if group and size + length > self.max_chars:
+                yield group
+                group = []
+                size = 0
+            group.append(i)
+            size += length
+        if group:
+            yield group
+
+    def _translate_packed(self, texts):
+        """Translate texts in one request, or return None if the result does not line up"""
+        try:
+            if self._batch_backend():
+                lines = [(line or '').strip() for line in self._request(list(texts))]
+            else:
+                result = self._request(DELIMITER.join(texts))
+                lines = [line.strip() for line in (result or '').split(DELIMITER)]
+        except Exception as e:
+            print(f"Batch translation error, retrying one by one: {e}")
+            return None
+
+        if len(lines) == len(texts) and all(lines):
+            self._failures = 0
+            return lines
+
+        self._failures += 1
+        self._count('translation_misaligned_batches')
+        if self._failures >= self.max_failures:
+            print("Translator does not keep line breaks, disabling request packing")
+            self.packing_enabled = False
+        return None
@@ -0,0 +1,89 @@
+"""
+LibreTranslate Stub Server
+
+A tiny offline stand-in for a LibreTranslate compatible server, to try out
+and benchmark the libretranslate translator backend without a real server.
+POST /translate accepts a text or a list of texts (the batch endpoint) and
+"translates" them by upper-casing, after an optional injected latency.
+Connections are kept alive like on the real server.
+
+Usage:
+python benchmarks/libreTranslateStub.py --port 5000 --latency 0.05
+python multiLanguageDecksMaker.py --input text.txt --translator libretranslate --translator-url http://localhost:5000
+
+Arguments:
+  --host: Interface to listen on (default: 127.0.0.1)
+  --port: Port to listen on (default: 5000)
+  --latency: Seconds of injected latency per request (default: 0)
+"""
+
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, don't let Nagle delay keep-alive answers
+    disable_nagle_algorithm = True
+    latency = 0.0
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            payload = json.loads(self.rfile.read(length))
+            q = payload['q']
+        except (ValueError, KeyError):
+            return self.send_json(400, {'error': 'Invalid request: missing q parameter'})
+        if self.path.rstrip('/') != '/translate':
+            return self.send_json(404, {'error': 'Not found'})
+
+        if self.latency:
+            time.sleep(self.latency)
+        if isinstance(q, list):
+            translated = [text.upper() for text in q]
+        else:
+            translated = q.upper()
+        self.send_json(200, {'translatedText': translated})
+
+    def send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_server(host='127.0.0.1', port=5000, latency=0.0):
+    """Create (but do not start) a stub server; port 0 picks a free port"""
+    handler = type('Handler', (StubHandler,), {'latency': latency})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline LibreTranslate compatible stub server')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=5000,
+                        help='Port to listen on (default: 5000)')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds of injected latency per request (default: 0)')
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.latency)
+    print(f"LibreTranslate stub listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Deck Generation Pipeline Benchmark
+
+Generates synthetic corpora and runs BilingualAnkiDeckGenerator and
+RussianAnkiDeckGenerator against an offline fake translator, reporting
+per-stage timings as JSON so results can be compared between versions.
+
+Usage:
+python benchmarks/pipelineBenchmark.py --words 1000 10000 100000 --latency 0.05 --output results.json
+
+Arguments:
+  --words: Corpus sizes in words (default: 1000 10000)
+  --vocabulary: Number of distinct words in the corpus (default: 5000)
+  --sentence-length: Average words per sentence (default: 12)
+  --latency: Seconds of injected latency per translator request (default: 0)
+  --per-char-latency: Extra seconds of latency per translated character (default: 0)
+  --generators: Generators to run, bilingual and/or russian (default: both)
+  --workers: Translation threads passed to the generators (default: 1)
+  --processes: Word extraction processes passed to the generators (default: 1)
+  --stream: Run the generators in streaming mode
+  --writer: Deck writer passed to the generators, genanki or bulk (default: genanki)
+  --seed: Random seed for the corpus (default: 42)
+  --output: Write the JSON results to this file instead of stdout
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multiLanguageDecksMaker import BilingualAnkiDeckGenerator
+from ankiDecksMaker import RussianAnkiDeckGenerator
+
+CYRILLIC = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+
+# Pipeline stages timed by the generators' metrics
+STAGES = ['sentence_tokenization', 'word_extraction', 'translation',
+          'note_construction', 'packaging']
+
+
+class FakeTranslator:
+    """Offline stand-in for GoogleTranslator with configurable latency"""
+
+    def __init__(self, latency=0.0, per_char_latency=0.0):
+        self.latency = latency
+        self.per_char_latency = per_char_latency
+        self.requests = 0
+        self.chars = 0
+        self.lock = threading.Lock()
+
+    def translate(self, text):
+        with self.lock:
+            self.requests += 1
+            self.chars += len(text)
+        delay = self.latency + self.per_char_latency * len(text)
+        if delay:
+            time.sleep(delay)
+        # Keep line breaks so packed requests split back cleanly
+        return '\n'.join(f"en:{line}" for line in text.split('\n'))
+
+
+def generate_corpus(path, words, vocabulary, sentence_length, seed):
+    """Write a synthetic corpus with Zipf-distributed word frequencies"""
+    rng = random.Random(seed)
+    vocab = set()
+    while len(vocab) < vocabulary:
+        vocab.add(''.join(rng.choice(CYRILLIC) for _ in range(rng.randint(3, 10))))
+    vocab = sorted(vocab)
+    weights = [1.0 / rank for rank in range(1, len(vocab) + 1)]
+
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < words:
+            length = max(3, int(rng.gauss(sentence_length, sentence_length / 3)))
+            length = min(length, words - written) or 1
+            sentence = rng.choices(vocab, weights, k=length)
+            f.write(sentence[0].capitalize() + ' ' + ' '.join(sentence[1:]) + '. ')
+            written += length
+    return written
+
+
+def run_generator(kind, input_file, output_file, args):
+    """Run one generator on input_file and return its timings"""
+    fake = FakeTranslator(args.latency, args.per_char_latency)
+    options = dict(workers=args.workers, processes=args.processes, stream=args.stream,
+                   writer=args.writer, quiet=True, translator=fake)
+    if kind == 'russian':
+        generator = RussianAnkiDeckGenerator(input_file, output_file, cache_file=None, **options)
+    else:
+        generator = BilingualAnkiDeckGenerator(input_file, 'ru', 'en', 'Benchmark Deck',
+                                               output_file, cache_file=None, **options)
+
+    start = time.perf_counter()
+    generator.generate_deck()
+    total = time.perf_counter() - start
+
+    metrics = generator.metrics.to_dict()
+    return {
+        'generator': kind,
+        'total_seconds': round(total, 6),
+        'stages': {stage: metrics['timers'].get(stage, {}).get('seconds', 0.0) for stage in STAGES},
+        'stage_calls': {stage: metrics['timers'].get(stage, {}).get('calls', 0) for stage in STAGES},
+        'translation_latency': metrics['histograms'].get('translation_request_seconds'),
+        'notes': generator.notes_written,
+        'translation_units': generator.translation_calls,
+        'translator_requests': fake.requests,
+        'translated_chars': fake.chars,
+        'output_bytes': os.path.getsize(output_file),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Anki deck generation pipeline')
+    parser.add_argument('--words', type=int, nargs='+', default=[1000, 10000],
+                        help='Corpus sizes in words (default: 1000 10000)')
+    parser.add_argument('--vocabulary', type=int, default=5000,
+                        help='Number of distinct words in the corpus (default: 5000)')
+    parser.add_argument('--sentence-length', type=int, default=12,
+                        help='Average words per sentence (default: 12)')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds of injected latency per translator request (default: 0)')
+    parser.add_argument('--per-char-latency', type=float, default=0.0,
+                        help='Extra seconds of latency per translated character (default: 0)')
+    parser.add_argument('--generators', nargs='+', choices=['bilingual', 'russian'],
+                        default=['bilingual', 'russian'],
+                        help='Generators to run (default: bilingual russian)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Translation threads passed to the generators (default: 1)')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Word extraction processes passed to the generators (default: 1)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Run the generators in streaming mode')
+    parser.add_argument('--writer', choices=['genanki', 'bulk'], default='genanki',
+                        help='Deck writer passed to the generators (default: genanki)')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='Random seed for the corpus (default: 42)')
+    parser.add_argument('--output', '-o',
+                        help='Write the JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': vars(args),
+        'runs': [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for words in args.words:
+            corpus = os.path.join(tmp, f'corpus_{words}.txt')
+            written = generate_corpus(corpus, words, args.vocabulary, args.sentence_length, args.seed)
+            for kind in args.generators:
+                print(f"Running {kind} generator on {written} words...", file=sys.stderr)
+                run = run_generator(kind, corpus, os.path.join(tmp, f'{kind}_{words}.apkg'), args)
+                run['words'] = written
+                results['runs'].append(run)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Startup Time Benchmark
+
+Measures how long it takes to import the deck makers, to print --help and
+to tokenize the first sentence (which loads the tokenizer), each in a fresh
+Python process. Results are printed as JSON.
+
+Usage:
+python benchmarks/startupBenchmark.py --repeat 5 --output startup.json
+
+Arguments:
+  --repeat: Fresh processes per measurement (default: 5)
+  --output: Write the JSON results to this file instead of stdout
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_SENTENCE = '''
+from textTokenizers import create_tokenizer
+tokenizer = create_tokenizer({mode!r}, 'russian')
+tokenizer.words('Это учебные карточки для Anki. Удачи!')
+'''
+
+MEASUREMENTS = {
+    'python_startup': ['-c', 'pass'],
+    'import_multiLanguageDecksMaker': ['-c', 'import multiLanguageDecksMaker'],
+    'import_ankiDecksMaker': ['-c', 'import ankiDecksMaker'],
+    'help': ['multiLanguageDecksMaker.py', '--help'],
+    'first_sentence_nltk': ['-c', FIRST_SENTENCE.format(mode='nltk')],
+    'first_sentence_regex': ['-c', FIRST_SENTENCE.format(mode='regex')],
+}
+
+
+def measure(arguments, repeat):
+    """Run python with the given arguments repeat times and return the wall times"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable] + arguments, cwd=REPO_DIR,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        times.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            return {'error': result.stderr.decode('utf-8', 'replace').strip().splitlines()[-1]}
+    return {
+        'min_seconds': round(min(times), 6),
+        'median_seconds': round(statistics.median(times), 6),
+        'max_seconds': round(max(times), 6),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark startup time of the deck makers')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Fresh processes per measurement (default: 5)')
+    parser.add_argument('--output', '-o',
+                        help='Write the JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'measurements': {name: measure(arguments, args.repeat)
+                         for name, arguments in MEASUREMENTS.items()},
+    }
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Deck Jobs for Batch Builds
+
+Lists the decks to build in one process, either every text file of a
+directory or the entries of a JSON manifest file:
+
+[
+  {"input": "books/war_and_peace.txt", "deck_name": "War and Peace"},
+  {"input": "news/de.txt", "output": "decks/news_de.apkg", "source_lang": "de", "target_lang": "en"}
+]
+
+Only "input" is required. Relative paths are relative to the manifest
+file. Missing fields take the values given on the command line; the
+output defaults to the input file name with an .apkg extension. Missing
+output directories are created when the jobs are listed.
+"""
+
+import glob
+import json
+import os
+
+DECK_JOB_FIELDS = ('input', 'output', 'deck_name', 'source_lang', 'target_lang')
+
+
+def directory_jobs(input_dir, output_dir=None, pattern='*.txt'):
+    """Return a job for every file matching pattern in input_dir, creating output_dir if needed"""
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    jobs = []
+    for path in sorted(glob.glob(os.path.join(input_dir, pattern))):
+        if not os.path.isfile(path):
+            continue
+        name = os.path.splitext(os.path.basename(path))[0]
+        jobs.append({'input': path, 'output': os.path.join(output_dir or input_dir, name + '.apkg')})
+    return jobs
+
+
+def load_jobs(manifest_file):
+    """Load the jobs of a JSON manifest file (a list of objects), creating missing output directories"""
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError(f"{manifest_file}: expected a list of deck entries")
+
+    base = os.path.dirname(os.path.abspath(manifest_file))
+    jobs = []
+    for number, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict) or not entry.get('input'):
+            raise ValueError(f"{manifest_file}: entry {number} has no input file")
+        unknown = set(entry) - set(DECK_JOB_FIELDS)
+        if unknown:
+            raise ValueError(f"{manifest_file}: entry {number} has unknown fields: {', '.join(sorted(unknown))}")
+        job = dict(entry)
+        job['input'] = os.path.join(base, entry['input'])
+        if entry.get('output'):
+            job['output'] = os.path.join(base, entry['output'])
+        else:
+            job['output'] = os.path.splitext(job['input'])[0] + '.apkg'
+        # Missing output directories are created now, not found missing once the deck is built
+        os.makedirs(os.path.dirname(job['output']), exist_ok=True)
+        jobs.append(job)
+    return jobs
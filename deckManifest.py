@@ -0,0 +1,99 @@
+"""
+Build Manifest for Incremental Deck Builds
+
+A small JSON sidecar written next to the .apkg file. It records which part
+of the input file has already been turned into cards and which words have
+been seen, so a re-run on an appended text file only processes the new
+tail and emits an update deck with just the new notes.
+
+The input is identified by its size and a hash of the last bytes of the
+processed part, which is enough to detect an appended file without reading
+the whole thing again.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+MANIFEST_VERSION = 1
+TAIL_HASH_BYTES = 4096
+
+
+def manifest_path_for(output_file):
+    """Return the manifest path belonging to an .apkg output file"""
+    return os.path.splitext(output_file)[0] + '.manifest.json'
+
+
+def file_tail_hash(path, end, size=TAIL_HASH_BYTES):
+    """Hash the size bytes of a file that end at byte offset end"""
+    start = max(0, end - size)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha1(f.read(end - start)).hexdigest()
+
+
+class DeckManifest:
+    def __init__(self, path):
+        self.path = path
+        self.data = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+
+    @property
+    def exists(self):
+        return bool(self.data)
+
+    @property
+    def input_bytes(self):
+        return self.data.get('input_bytes', 0)
+
+    @property
+    def seen_words(self):
+        return self.data.get('seen_words', [])
+
+    def covers(self, input_file, deck_id, source_lang, target_lang):
+        """Check whether the manifest describes a prefix of input_file for this deck"""
+        if not self.exists or self.data.get('version') != MANIFEST_VERSION:
+            return False
+        if (self.data.get('deck_id'), self.data.get('source_lang'),
+                self.data.get('target_lang')) != (deck_id, source_lang, target_lang):
+            return False
+
+        end = self.input_bytes
+        if not os.path.exists(input_file) or os.path.getsize(input_file) < end:
+            return False
+        return file_tail_hash(input_file, end) == self.data.get('input_tail_sha1')
+
+    def record_build(self, input_file, deck_id, deck_name, source_lang, target_lang,
+                     start_bytes, end_bytes, seen_words, sentences, notes):
+        """Record a finished build covering input_file up to end_bytes"""
+        builds = self.data.get('builds', []) if start_bytes else []
+        builds.append({
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'start_bytes': start_bytes,
+            'end_bytes': end_bytes,
+            'sentences': sentences,
+            'notes': notes,
+        })
+        self.data = {
+            'version': MANIFEST_VERSION,
+            'deck_id': deck_id,
+            'deck_name': deck_name,
+            'source_lang': source_lang,
+            'target_lang': target_lang,
+            'input_file': os.path.abspath(input_file),
+            'input_bytes': end_bytes,
+            'input_tail_sha1': file_tail_hash(input_file, end_bytes),
+            'sentences_processed': sum(build['sentences'] for build in builds),
+            'builds': builds,
+            'seen_words': sorted(seen_words),
+        }
+
+    def save(self):
+        """Write the manifest atomically"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
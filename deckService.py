@@ -0,0 +1,417 @@
+"""
+Anki Deck Generator HTTP Service
+
+A small local HTTP service (standard library only) that builds decks on
+request. It keeps one MultiDeckGenerator for its whole lifetime, so the
+tokenizers, translators, translation cache and rate limit stay warm between
+requests and a small deck costs little more than its translation time.
+
+Decks are built by a fixed number of worker threads from a bounded job
+queue. When the queue is full the service answers 503 with Retry-After
+instead of piling up work.
+
+Endpoints:
+  POST /decks            JSON {"text": ..., "source_lang": "ru", "target_lang": "en", "deck_name": ...}
+                         plus optional "top_n", "min_count", "stem", "plan_examples".
+                         Small texts: waits and returns the .apkg file (200).
+                         Large texts: returns {"job_id": ..., "status_url": ...} (202).
+  GET  /jobs/<id>        Job status: queued, running, done or failed
+  GET  /jobs/<id>/deck   The .apkg file of a finished job
+  GET  /health           Queue and worker status
+
+Usage:
+python deckService.py --port 8080 --workers 2 --queue-size 16
+curl -X POST localhost:8080/decks -d '{"text": "Это учебные карточки."}' -o deck.apkg
+
+Arguments:
+  --host: Interface to listen on (default: 127.0.0.1)
+  --port: Port to listen on (default: 8080)
+  --workers: Decks built at the same time (default: 2)
+  --queue-size: Jobs waiting to be built before new requests are refused (default: 16)
+  --sync-chars: Texts up to this many characters are answered with the deck directly (default: 20000)
+  --max-chars: Largest accepted text in characters (default: 5000000)
+  --keep-jobs: Finished jobs (and their decks) kept for download (default: 100)
+  --work-dir: Directory for the texts and decks of jobs (default: a temporary directory)
+  --cache: Path of the persistent translation cache (default: translation_cache.db)
+  --no-cache: Disable the translation cache
+  --rate-limit: Maximum translator requests per second over all jobs, 0 for no limit (default: 0)
+  --tokenizer: nltk (punkt, default) or regex (no NLTK needed)
+  --translator: Translator backend, google or libretranslate (default: google)
+  --translator-url: URL of the LibreTranslate compatible server (default: http://localhost:5000)
+  --translator-api-key: API key for the LibreTranslate server
+  --writer: genanki (default) or bulk
+  --audio: Add pronunciation clips of the source words to every deck (needs espeak-ng)
+  --media-cache: Directory of the synthesized clips (default: media_cache)
+"""
+
+import argparse
+import json
+import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiLanguageDecksMaker import MultiDeckGenerator, WRITERS, stem_language
+from runJournal import journal_path_for
+from speechSynthesizer import DEFAULT_MEDIA_CACHE_DIR, DEFAULT_TTS_ENGINE
+from textTokenizers import TOKENIZER_MODES
+from translationCache import DEFAULT_CACHE_FILE
+from translatorBackends import TRANSLATOR_BACKENDS, DEFAULT_LIBRETRANSLATE_URL
+
+DEFAULT_SYNC_CHARS = 20000
+DEFAULT_MAX_CHARS = 5000000
+# Deck settings a request may choose
+REQUEST_OPTIONS = {'top_n': int, 'min_count': int, 'stem': bool, 'plan_examples': bool}
+LANG_CODE = re.compile(r'^[a-zA-Z]{2,3}(-[a-zA-Z]{2,4})?$')
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+class DeckJob:
+    def __init__(self, job_id, text_file, output_file, deck_name, source_lang, target_lang, options):
+        self.job_id = job_id
+        self.text_file = text_file
+        self.output_file = output_file
+        self.deck_name = deck_name
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.options = options
+        self.status = 'queued'
+        self.error = None
+        self.notes = 0
+        self.created = time.time()
+        self.finished = None
+        self.done = threading.Event()
+        # Requests sending (or waiting to send) the deck; it is not pruned meanwhile
+        self.readers = 0
+
+    def to_dict(self):
+        data = {'job_id': self.job_id, 'status': self.status, 'deck_name': self.deck_name,
+                'source_lang': self.source_lang, 'target_lang': self.target_lang}
+        if self.status == 'done':
+            data['notes'] = self.notes
+            data['deck_url'] = f"/jobs/{self.job_id}/deck"
+        if self.error:
+            data['error'] = self.error
+        if self.finished:
+            data['seconds'] = round(self.finished - self.created, 3)
+        return data
+
+
+class DeckService:
+    def __init__(self, work_dir=None, workers=2, queue_size=16, keep_jobs=100, **options):
+        # options: MultiDeckGenerator settings shared by all jobs (cache, translator, rate limit, ...)
+        if keep_jobs < 1:
+            raise ValueError("keep_jobs must be at least 1")
+        self.builder = MultiDeckGenerator([], quiet=True, **options)
+        self.own_work_dir = work_dir is None
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix='deck_service_')
+        os.makedirs(self.work_dir, exist_ok=True)
+        self.keep_jobs = keep_jobs
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.running = 0
+        self.workers = [threading.Thread(target=self.work, daemon=True) for _ in range(max(1, workers))]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, text, deck_name, source_lang, target_lang, options, hold=False):
+        """Queue a deck job, raising ServiceBusy when the queue is full
+
+        hold: keep the deck of the job until release(), for a request waiting to send it
+        """
+        job_id = uuid.uuid4().hex
+        text_file = os.path.join(self.work_dir, job_id + '.txt')
+        with open(text_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+        job = DeckJob(job_id, text_file, os.path.join(self.work_dir, job_id + '.apkg'),
+                      deck_name, source_lang, target_lang, options)
+        if hold:
+            job.readers = 1
+        with self.lock:
+            self.jobs[job_id] = job
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            with self.lock:
+                del self.jobs[job_id]
+            os.remove(text_file)
+            raise ServiceBusy()
+        return job
+
+    def work(self):
+        """Worker thread: build queued jobs one after the other"""
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            with self.lock:
+                self.running += 1
+            job.status = 'running'
+            try:
+                generator = self.builder.build_deck(job.text_file, job.output_file, job.deck_name,
+                                                    job.source_lang, job.target_lang, **job.options)
+                job.notes = generator.notes_written
+                job.status = 'done'
+            except Exception as e:
+                job.status = 'failed'
+                job.error = str(e)
+            finally:
+                job.finished = time.time()
+                for path in (job.text_file, journal_path_for(job.output_file)):
+                    if os.path.exists(path):
+                        os.remove(path)
+                with self.lock:
+                    self.running -= 1
+                job.done.set()
+                self.prune()
+
+    def prune(self):
+        """Forget the oldest finished jobs (and delete their decks) beyond keep_jobs
+
+        Decks still being sent are kept, they are pruned after their release.
+        """
+        with self.lock:
+            finished = [job for job in self.jobs.values() if job.done.is_set()]
+            excess = len(finished) - self.keep_jobs
+            for job in finished:
+                if excess <= 0:
+                    break
+                if job.readers:
+                    continue
+                del self.jobs[job.job_id]
+                excess -= 1
+                if os.path.exists(job.output_file):
+                    os.remove(job.output_file)
+
+    def hold(self, job):
+        """Keep the deck of a job while it is sent, False when the job was already pruned"""
+        with self.lock:
+            if self.jobs.get(job.job_id) is not job:
+                return False
+            job.readers += 1
+            return True
+
+    def release(self, job):
+        """Let a job held for sending its deck be pruned again"""
+        with self.lock:
+            job.readers -= 1
+        self.prune()
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def status(self):
+        with self.lock:
+            return {'queued': self.queue.qsize(), 'queue_size': self.queue.maxsize,
+                    'running': self.running, 'workers': len(self.workers), 'jobs': len(self.jobs)}
+
+    def close(self):
+        """Stop the workers and close the shared translation cache, dictionaries and speech synthesizer"""
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        if self.builder.cache:
+            self.builder.cache.close()
+        for dictionary in self.builder.dictionaries.values():
+            dictionary.close()
+        if self.builder.speech:
+            self.builder.speech.close()
+        if self.own_work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+class DeckRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    service = None
+    sync_chars = DEFAULT_SYNC_CHARS
+    max_chars = DEFAULT_MAX_CHARS
+
+    def do_GET(self):
+        parts = self.path.split('?')[0].strip('/').split('/')
+        if parts == ['health']:
+            return self.send_json(200, self.service.status())
+        if len(parts) in (2, 3) and parts[0] == 'jobs':
+            job = self.service.get(parts[1])
+            if job is None:
+                return self.send_json(404, {'error': 'Unknown job'})
+            if len(parts) == 2:
+                return self.send_json(200, job.to_dict())
+            if parts[2] == 'deck':
+                if job.status != 'done':
+                    return self.send_json(409, job.to_dict())
+                if not self.service.hold(job):
+                    return self.send_json(404, {'error': 'Unknown job'})
+                try:
+                    return self.send_deck(job)
+                finally:
+                    self.service.release(job)
+        self.send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if self.path.split('?')[0].rstrip('/') != '/decks':
+            return self.send_json(404, {'error': 'Not found'})
+        try:
+            request = self.read_request()
+        except ValueError as e:
+            return self.send_json(400, {'error': str(e)})
+        if len(request['text']) > self.max_chars:
+            return self.send_json(413, {'error': f"Text longer than {self.max_chars} characters"})
+
+        sync = len(request['text']) <= self.sync_chars
+        try:
+            # A deck answered directly is held until sent, so it can't be pruned first
+            job = self.service.submit(hold=sync, **request)
+        except ServiceBusy:
+            return self.send_json(503, {'error': 'Too many queued decks, try again later'},
+                                  headers={'Retry-After': '5'})
+
+        if not sync:
+            return self.send_json(202, {'job_id': job.job_id, 'status_url': f"/jobs/{job.job_id}"})
+        try:
+            job.done.wait()
+            if job.status != 'done':
+                return self.send_json(500, job.to_dict())
+            self.send_deck(job)
+        finally:
+            self.service.release(job)
+
+    def read_request(self):
+        """Parse and validate the JSON body of a deck request"""
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            data = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            raise ValueError('Request body is not valid JSON')
+        if not isinstance(data, dict) or not isinstance(data.get('text'), str) or not data['text'].strip():
+            raise ValueError('Missing "text"')
+
+        source_lang = data.get('source_lang', 'ru')
+        target_lang = data.get('target_lang', 'en')
+        for lang in (source_lang, target_lang):
+            if not isinstance(lang, str) or not LANG_CODE.match(lang):
+                raise ValueError(f"Invalid language code: {lang}")
+        options = {}
+        for name, kind in REQUEST_OPTIONS.items():
+            value = data.get(name)
+            if value is None:
+                continue
+            # bool is an int too, but {"top_n": true} is not a count
+            if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+                raise ValueError(f'"{name}" must be of type {kind.__name__}')
+            if kind is int and value < 1:
+                raise ValueError(f'"{name}" must be at least 1')
+            options[name] = value
+        # Checked here, so a deck failing on its options is a bad request, not a server error
+        if options.get('stem'):
+            stem_language(source_lang)
+        return {'text': data['text'], 'deck_name': str(data.get('deck_name') or 'Language Learning Deck'),
+                'source_lang': source_lang, 'target_lang': target_lang, 'options': options}
+
+    def send_deck(self, job):
+        with open(job.output_file, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/apkg')
+        self.send_header('Content-Disposition', f'attachment; filename="{job.job_id}.apkg"')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_server(service, host='127.0.0.1', port=8080, sync_chars=DEFAULT_SYNC_CHARS,
+                  max_chars=DEFAULT_MAX_CHARS):
+    """Create (but do not start) the HTTP server of a DeckService; port 0 picks a free port"""
+    handler = type('Handler', (DeckRequestHandler,),
+                   {'service': service, 'sync_chars': sync_chars, 'max_chars': max_chars})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local HTTP service building Anki decks from text')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080,
+                        help='Port to listen on (default: 8080)')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Decks built at the same time (default: 2)')
+    parser.add_argument('--queue-size', type=int, default=16,
+                        help='Jobs waiting to be built before new requests are refused (default: 16)')
+    parser.add_argument('--sync-chars', type=int, default=DEFAULT_SYNC_CHARS,
+                        help=f'Texts up to this many characters are answered with the deck directly (default: {DEFAULT_SYNC_CHARS})')
+    parser.add_argument('--max-chars', type=int, default=DEFAULT_MAX_CHARS,
+                        help=f'Largest accepted text in characters (default: {DEFAULT_MAX_CHARS})')
+    parser.add_argument('--keep-jobs', type=int, default=100,
+                        help='Finished jobs (and their decks) kept for download (default: 100)')
+    parser.add_argument('--work-dir',
+                        help='Directory for the texts and decks of jobs (default: a temporary directory)')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_FILE,
+                        help=f'Path of the persistent translation cache (default: {DEFAULT_CACHE_FILE})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Disable the translation cache')
+    parser.add_argument('--rate-limit', type=float, default=0,
+                        help='Maximum translator requests per second over all jobs, 0 for no limit (default: 0)')
+    parser.add_argument('--tokenizer', choices=TOKENIZER_MODES, default='nltk',
+                        help='nltk (punkt, default) or regex (no NLTK needed)')
+    parser.add_argument('--translator', choices=sorted(TRANSLATOR_BACKENDS), default='google',
+                        help='Translator backend (default: google)')
+    parser.add_argument('--translator-url', default=DEFAULT_LIBRETRANSLATE_URL,
+                        help=f'URL of the LibreTranslate compatible server (default: {DEFAULT_LIBRETRANSLATE_URL})')
+    parser.add_argument('--translator-api-key',
+                        help='API key for the LibreTranslate server')
+    parser.add_argument('--writer', choices=WRITERS, default='genanki',
+                        help='genanki (default) or bulk')
+    parser.add_argument('--audio', action='store_true',
+                        help=f'Add pronunciation clips of the source words to every deck (needs {DEFAULT_TTS_ENGINE})')
+    parser.add_argument('--media-cache', default=DEFAULT_MEDIA_CACHE_DIR,
+                        help=f'Directory of the synthesized clips (default: {DEFAULT_MEDIA_CACHE_DIR})')
+    args = parser.parse_args()
+    if args.keep_jobs < 1:
+        parser.error('--keep-jobs must be at least 1')
+    if args.audio and shutil.which(DEFAULT_TTS_ENGINE) is None:
+        parser.error(f'--audio needs {DEFAULT_TTS_ENGINE}, which was not found on the PATH')
+
+    translator_options = {}
+    if args.translator == 'libretranslate':
+        translator_options = dict(url=args.translator_url, api_key=args.translator_api_key)
+    service = DeckService(work_dir=args.work_dir, workers=args.workers, queue_size=args.queue_size,
+                          keep_jobs=args.keep_jobs, cache_file=None if args.no_cache else args.cache,
+                          rate_limit=args.rate_limit, tokenizer=args.tokenizer, writer=args.writer,
+                          translator=args.translator, translator_options=translator_options,
+                          audio=args.audio, media_cache=args.media_cache)
+    server = create_server(service, args.host, args.port, args.sync_chars, args.max_chars)
+    print(f"Deck service listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Example Sentence Planner
+
+By default the example of a new word is the sentence it first appears in,
+and every such sentence is translated. The planner instead picks a small
+set of short sentences that together contain every selected word: a
+greedy weighted set cover over the sentence/word incidence collected in
+the vocabulary pre-pass, where the weight of a sentence is the number of
+characters it costs to translate. Only the chosen sentences are then used
+as examples (and translated), each word with the first chosen sentence it
+occurs in.
+"""
+
+import heapq
+
+
+class ExamplePlanner:
+    def __init__(self):
+        # sentence id -> (translation cost in characters, keys of its words)
+        self.sentences = {}
+
+    def add_sentence(self, sentence_id, sentence, keys):
+        """Record which word keys a sentence contains"""
+        if keys:
+            # Each sentence costs its characters plus the delimiter of a packed request
+            self.sentences[sentence_id] = (len(sentence) + 1, frozenset(keys))
+
+    def plan(self, words):
+        """Return the ids of a cheap set of sentences that together contain every word"""
+        uncovered = set(words)
+        # Lazy greedy: gains only shrink, so a popped entry whose gain is still current is the best
+        heap = []
+        for sentence_id, (cost, keys) in self.sentences.items():
+            gain = len(keys & uncovered)
+            if gain:
+                heap.append((cost / gain, sentence_id))
+        heapq.heapify(heap)
+
+        chosen = set()
+        while heap and uncovered:
+            ratio, sentence_id = heapq.heappop(heap)
+            cost, keys = self.sentences[sentence_id]
+            gain = len(keys & uncovered)
+            if not gain:
+                continue
+            if cost / gain > ratio:
+                heapq.heappush(heap, (cost / gain, sentence_id))
+                continue
+            chosen.add(sentence_id)
+            uncovered -= keys
+        return chosen
+
+    def cost(self, sentence_ids=None):
+        """Return the translation characters of the given sentences (all sentences by default)"""
+        if sentence_ids is None:
+            return sum(cost for cost, _ in self.sentences.values())
+        return sum(self.sentences[sentence_id][0] for sentence_id in sentence_ids)
@@ -0,0 +1,97 @@
+"""
+Known Words from Existing Decks
+
+Reads the source words of a previously built .apkg package, or of an Anki
+collection file (collection.anki2), so words the learner already owns are
+neither translated nor emitted again. The package's SQLite collection is
+extracted to a temporary file and opened read-only; only the note type
+definitions and the note fields are read.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import zipfile
+from pathlib import Path
+
+# Note fields holding the source word, in the decks of both generators
+SOURCE_WORD_FIELDS = ('SourceWord', 'Russian')
+# Collection files of Anki packages
+COLLECTION_FILES = ('collection.anki21', 'collection.anki2')
+# zstd compressed collection of newer exports, whose collection.anki2 is only a placeholder
+COMPRESSED_COLLECTION_FILE = 'collection.anki21b'
+
+FIELD_SEPARATOR = '\x1f'
+
+
+def clean_field(value):
+    """Turn a field value into a word as extract_words cleans it"""
+    text = re.sub(r'<[^>]+>', '', value)
+    return re.sub(r'[^\w]', '', text).lower()
+
+
+def source_field_indexes(conn, field_names):
+    """Map note type id -> index of its source word field"""
+    indexes = {}
+    models = conn.execute('SELECT models FROM col').fetchone()
+    if models and models[0]:
+        for model_id, model in json.loads(models[0]).items():
+            for index, field in enumerate(model.get('flds', [])):
+                if field.get('name') in field_names:
+                    indexes[int(model_id)] = index
+                    break
+    else:
+        # Newer collections keep the note types in their own tables
+        for model_id, index, name in conn.execute('SELECT ntid, ord, name FROM fields ORDER BY ord'):
+            if name in field_names:
+                indexes.setdefault(model_id, index)
+    return indexes
+
+
+def load_known_words(apkg_path, field_names=SOURCE_WORD_FIELDS):
+    """Return the set of (cleaned) source words of the notes in an .apkg package or Anki collection"""
+    if not zipfile.is_zipfile(apkg_path):
+        # A collection database itself, e.g. collection.anki2 of an Anki profile
+        return read_known_words(apkg_path, field_names)
+    with zipfile.ZipFile(apkg_path) as package:
+        names = set(package.namelist())
+        if COMPRESSED_COLLECTION_FILE in names:
+            raise ValueError(f"{apkg_path} has a compressed {COMPRESSED_COLLECTION_FILE} collection, which "
+                             f"is not supported: export it with \"Support older Anki versions\" checked")
+        collection = next((name for name in COLLECTION_FILES if name in names), None)
+        if collection is None:
+            raise ValueError(f"{apkg_path} has no readable collection "
+                             f"(expected one of {', '.join(COLLECTION_FILES)})")
+        fd, db_path = tempfile.mkstemp(suffix='.anki2')
+        try:
+            with os.fdopen(fd, 'wb') as f, package.open(collection) as source:
+                while True:
+                    block = source.read(1 << 20)
+                    if not block:
+                        break
+                    f.write(block)
+            return read_known_words(db_path, field_names)
+        finally:
+            os.remove(db_path)
+
+
+def read_known_words(db_path, field_names=SOURCE_WORD_FIELDS):
+    """Return the set of source words of the notes in an Anki collection database"""
+    conn = sqlite3.connect(Path(db_path).resolve().as_uri() + '?mode=ro', uri=True)
+    try:
+        indexes = source_field_indexes(conn, field_names)
+        words = set()
+        for model_id, fields in conn.execute('SELECT mid, flds FROM notes'):
+            index = indexes.get(model_id)
+            if index is None:
+                continue
+            values = fields.split(FIELD_SEPARATOR)
+            if index < len(values):
+                word = clean_field(values[index])
+                if word:
+                    words.add(word)
+        return words
+    finally:
+        conn.close()
@@ -0,0 +1,162 @@
+"""
+Pipeline Metrics and Progress Reporting
+
+Metrics collects timers, counters and latency histograms for the stages of
+deck generation (tokenization, word extraction, translation, note creation,
+packaging) and can dump them as JSON. It is safe to use from the
+translation threads.
+
+ProgressReporter prints a single, throttled progress line with throughput
+and ETA instead of one line per sentence.
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        """Record one value"""
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def to_dict(self):
+        labels = [f"<={bound}" for bound in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'mean': round(self.total / self.count, 6) if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timers = {}
+        self.counters = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, name):
+        """Time a block of code and add it to the named timer"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        """Add seconds to a timer"""
+        with self.lock:
+            timer = self.timers.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            timer['seconds'] += seconds
+            timer['calls'] += 1
+
+    def count(self, name, value=1):
+        """Increase a counter"""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        """Record a value in a histogram"""
+        with self.lock:
+            self.histograms.setdefault(name, Histogram()).observe(value)
+
+    def seconds(self, name):
+        """Return the total seconds of a timer"""
+        return self.timers.get(name, {}).get('seconds', 0.0)
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'elapsed_seconds': round(time.perf_counter() - self.started, 6),
+                'timers': {name: {'seconds': round(timer['seconds'], 6), 'calls': timer['calls']}
+                           for name, timer in self.timers.items()},
+                'counters': dict(self.counters),
+                'histograms': {name: histogram.to_dict()
+                               for name, histogram in self.histograms.items()},
+            }
+
+    def write_json(self, path, **extra):
+        """Write all metrics (plus any extra fields) to a JSON file"""
+        data = self.to_dict()
+        data.update(extra)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+class ProgressReporter:
+    def __init__(self, total=None, interval=1.0, enabled=True, stream=None):
+        self.total = total
+        self.interval = interval
+        self.enabled = enabled
+        self.stream = stream or sys.stdout
+        self.started = time.perf_counter()
+        self.last_report = 0.0
+        self.done = 0
+        self.shown = False
+
+    def update(self, done, **fields):
+        """Record progress and print the progress line at most once per interval"""
+        self.done = done
+        now = time.perf_counter()
+        if self.enabled and now - self.last_report >= self.interval:
+            self.last_report = now
+            self._print(now, fields)
+
+    def finish(self, **fields):
+        """Print the final progress line"""
+        if self.enabled:
+            self._print(time.perf_counter(), fields)
+            if self.shown and self.stream.isatty():
+                self.stream.write('\n')
+
+    def _print(self, now, fields):
+        elapsed = max(now - self.started, 1e-9)
+        rate = self.done / elapsed
+        position = f"{self.done}/{self.total}" if self.total else f"{self.done}"
+        parts = [f"Sentences {position}", f"{rate:.1f}/s"]
+        parts += [f"{name.replace('_', ' ')} {value}" for name, value in fields.items()]
+        if self.total and rate > 0:
+            parts.append(f"ETA {format_duration((self.total - self.done) / rate)}")
+        parts.append(f"elapsed {format_duration(elapsed)}")
+
+        line = ' | '.join(parts)
+        if self.stream.isatty():
+            self.stream.write('\r' + line.ljust(79))
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+        self.shown = True
+
+
+def format_duration(seconds):
+    """Format seconds as h:mm:ss"""
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
@@ -8,58 +8,265 @@ Usage:
 python ankiDecksMaker.py --input <file.txt> --source-lang ru --target-lang en --deck-name "My Deck"
 
 Arguments:
-  --input: Path to input text file (required)
+  --input: Path to input text file (this, --input-dir or --decks is required)
+  --input-dir: Build a deck for every .txt file of this directory, in one process
+  --decks: Build the decks listed in this JSON manifest file, in one process
+  --output-dir: Directory of the decks built with --input-dir (default: the input directory)
+  --deck-workers: Decks built at the same time with --input-dir or --decks (default: 4)
   --source-lang: Source language ISO 639-1 code (default: ru)
-  --target-lang: Target language ISO 639-1 code (default: en)
+  --target-lang: Target language ISO 639-1 code, or several separated by commas (default: en)
   --deck-name: Name of the Anki deck (default: "Language Learning Deck")
   --output: Output .apkg file path (default: language_deck.apkg)
+  --cache: Path of the persistent translation cache (default: translation_cache.db)
+  --cache-size: Maximum number of cached translations (default: 200000)
+  --no-cache: Disable the translation cache
+  --batch-chars: Maximum characters packed into one translation request (default: 4500)
+  --workers: Number of concurrent translation threads (default: 1)
+  --rate-limit: Maximum translator requests per second, 0 for no limit (default: 0)
+  --retries: Retries with backoff when the translator throttles us (default: 3)
+  --stream: Read and process the input file in chunks instead of loading it whole
+  --chunk-size: Characters read per chunk in streaming mode (default: 1048576)
+  --incremental: Only process text appended since the last build and write an update deck
+  --resume: Continue an interrupted run from its last checkpoint (the <output>.journal.jsonl file)
+  --metrics-out: Write timings, counters and translation latency histogram to this JSON file
+  --quiet: Only print errors
+  --verbose: Print every sentence and its new words instead of a progress line
+  --processes: Worker processes for word extraction (default: 1)
+  --shard-size: Sentences per word extraction task in multi-process mode (default: 500)
+  --tokenizer: nltk (punkt, default) or regex (no NLTK needed)
+  --top-n: Only learn the N most frequent words
+  --min-count: Only learn words occurring at least this many times (default: 1)
+  --stopwords: File with words to skip (one per line), or "nltk" for NLTK's stopword list
+  --stem: Group inflected forms of a word (Snowball stemmer) and create cards once per group
+  --plan-examples: Pick a small set of short example sentences covering all words and only translate those
+  --audio: Add pronunciation clips of the source words, made offline with espeak-ng
+  --tts-voice: espeak-ng voice of the clips (default: the source language code)
+  --tts-processes: Worker processes synthesizing clips (default: 2)
+  --media-cache: Directory of the synthesized clips, shared by all decks and runs (default: media_cache)
+  --writer: genanki (default) or bulk, which streams notes into the .apkg database as they are made
+  --known-from: Existing .apkg deck or Anki collection whose words are skipped (can be given several times)
+  --subdecks: With several target languages, write one package with a subdeck per language
+  --translator: Translator backend for sentences and dictionary misses, google or libretranslate (default: google)
+  --translator-url: URL of the LibreTranslate compatible server (default: http://localhost:5000)
+  --translator-api-key: API key for the LibreTranslate server
+  --translator-timeout: Seconds to wait for a connection to the translation server (default: 5)
+  --translator-read-timeout: Seconds to wait for a translation server answer (default: 60)
+  --translator-concurrency: Maximum simultaneous requests (pooled keep-alive connections) to the server (default: 4)
+  --dictionary: Local tab-separated word<TAB>translation dictionary used for words before the translator
+                ({source} and {target} in the path are replaced by the language codes)
 """
 
-import genanki
-import random
+import hashlib
+import io
+import os
 import re
+import shutil
+import sys
 import argparse
-from deep_translator import GoogleTranslator
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
+from collections import deque, namedtuple
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from translationCache import TranslationCache, DEFAULT_CACHE_FILE, DEFAULT_MAX_ENTRIES
+from batchTranslator import BatchTranslator, DEFAULT_MAX_CHARS
+from rateLimiter import TokenBucket
+from deckManifest import DeckManifest, manifest_path_for, file_tail_hash
+from runJournal import RunJournal, journal_path_for
+from metrics import Metrics, ProgressReporter, format_duration
+from textTokenizers import create_tokenizer, process_tokenizer, TOKENIZER_MODES
+from vocabularyIndex import VocabularyIndex, load_stopwords
+from examplePlanner import ExamplePlanner
+from speechSynthesizer import SpeechSynthesizer, DEFAULT_MEDIA_CACHE_DIR, DEFAULT_TTS_ENGINE, \
+    DEFAULT_TTS_PROCESSES
+from apkgWriter import ApkgWriter
+from knownWords import load_known_words
+from deckJobs import directory_jobs, load_jobs
+from translatorBackends import DictionaryTranslator, create_translator, TRANSLATOR_BACKENDS, \
+    DEFAULT_LIBRETRANSLATE_URL, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, DEFAULT_CONCURRENCY
+
+WRITERS = ('genanki', 'bulk')
+
+# genanki, deep_translator and NLTK are imported on first use, so importing
+# this module and running --help stay fast and work offline
+
+# Characters read at a time in streaming mode
+DEFAULT_CHUNK_SIZE = 1 << 20
+# Text without a sentence boundary is cut at a space once it spans this many chunks
+MAX_CARRY_CHUNKS = 4
+# Sentences per word extraction task when using several processes
+DEFAULT_SHARD_SIZE = 500
+
+# Language name mapping for NLTK tokenization
+NLTK_LANGUAGES = {
+    'ru': 'russian', 'en': 'english', 'es': 'spanish', 'fr': 'french',
+    'de': 'german', 'it': 'italian', 'pt': 'portuguese', 'nl': 'dutch',
+    'pl': 'polish', 'cs': 'czech', 'da': 'danish', 'et': 'estonian',
+    'fi': 'finnish', 'el': 'greek', 'no': 'norwegian', 'sl': 'slovene',
+    'sv': 'swedish', 'tr': 'turkish'
+}
+
+
+def stem_language(source_lang):
+    """Return the Snowball stemmer language of a source language, raising ValueError when there is none"""
+    from nltk.stem.snowball import SnowballStemmer
+    language = NLTK_LANGUAGES.get(source_lang)
+    if language not in SnowballStemmer.languages:
+        raise ValueError(f"Stemming is not available for source language '{source_lang}', "
+                         f"Snowball has no stemmer for it")
+    return language
+
+
+def stable_id(*parts):
+    """Derive a deterministic Anki deck/model ID in [2**30, 2**31) from the given parts"""
+    digest = hashlib.sha1('\x1f'.join(str(part) for part in parts).encode('utf-8')).digest()
+    return (1 << 30) + int.from_bytes(digest[:4], 'big') % (1 << 30)
+
+
+def model_id(*parts, extra_fields=()):
+    """Derive a model ID from the given parts and the names of its optional fields"""
+    # Anki cannot merge note types whose fields differ, so optional fields mean a new ID;
+    # without any the ID is the one the model always had
+    return stable_id('model', *parts, *(field['name'] for field in extra_fields))
+
+# One row of a sentence's token table: cleaned word, original token and its offsets
+Token = namedtuple('Token', ['clean', 'original', 'start', 'end'])
+
+
+def extract_words(sentence, tokenizer):
+    """Build the token table of a single sentence, keeping only real words"""
+    clean_words = []
+    for word, start, end in tokenizer.word_spans(sentence):
+        # Clean word and filter out punctuation
+        clean_word = re.sub(r'[^\w]', '', word).lower()
+        if len(clean_word) > 2 and clean_word.isalpha():
+            clean_words.append(Token(clean_word, word, start, end))
+    return clean_words
+
+
+def extract_words_from_shard(sentences, tokenizer_mode, lang_name):
+    """Extract the words of a shard of sentences (runs in a worker process)"""
+    tokenizer = process_tokenizer(tokenizer_mode, lang_name)
+    return [extract_words(sentence, tokenizer) for sentence in sentences]
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt_tab')
-except LookupError:
-    nltk.download('punkt_tab')
 
 class BilingualAnkiDeckGenerator:
     def __init__(self, input_file, source_lang='ru', target_lang='en', 
-                 deck_name='Language Learning Deck', output_file="language_deck.apkg"):
+                 deck_name='Language Learning Deck', output_file="language_deck.apkg",
+                 cache_file=DEFAULT_CACHE_FILE, cache_size=DEFAULT_MAX_ENTRIES,
+                 batch_chars=DEFAULT_MAX_CHARS, workers=1, rate_limit=0, retries=3,
+                 stream=False, chunk_size=DEFAULT_CHUNK_SIZE, incremental=False,
+                 quiet=False, verbose=False, metrics_out=None,
+                 processes=1, shard_size=DEFAULT_SHARD_SIZE, tokenizer='nltk',
+                 top_n=None, min_count=1, stopwords=None, stem=False, writer='genanki',
+                 known_from=None, cache=None, translator='google', translator_options=None,
+                 dictionary=None, resume=False, plan_examples=False, audio=False, tts_voice=None,
+                 tts_processes=DEFAULT_TTS_PROCESSES, media_cache=DEFAULT_MEDIA_CACHE_DIR, speech=None):
+        import genanki
+        
         self.input_file = input_file
         self.source_lang = source_lang
         self.target_lang = target_lang
         self.deck_name = deck_name
         self.output_file = output_file
-        self.translator = GoogleTranslator(source=source_lang, target=target_lang)
-        self.deck_id = random.randrange(1 << 30, 1 << 31)
+        # Streaming mode reads the input in chunks of chunk_size characters
+        self.stream = stream
+        self.chunk_size = chunk_size
+        # Word extraction runs on this many processes, shard_size sentences per task
+        self.processes = max(1, processes)
+        self.shard_size = shard_size
+        # Tokenizers (and their punkt models) are loaded on first use and kept per language
+        self.tokenizer_mode = tokenizer
+        self.tokenizers = {}
+        # Vocabulary selection (pre-pass over the whole input when any limit is set)
+        self.top_n = top_n
+        self.min_count = min_count
+        self.stopwords = stopwords
+        self.vocabulary = None
+        # Optionally choose example sentences by weighted set cover instead of first occurrence
+        self.plan_examples = plan_examples
+        # Optional stemming: inflected forms share one key and one set of cards
+        self.stem = stem
+        self.stemmer = None
+        self.word_keys = {}
+        # genanki keeps all notes in the deck until the end, bulk streams them to disk
+        self.writer_mode = writer
+        self.writer = None
+        self.notes_written = 0
+        # Every finished window is checkpointed to the run journal; resume continues from it
+        self.resume = resume
+        self.journal_file = journal_path_for(output_file)
+        self.journal_notes = None
+        # Incremental builds skip the part of the input covered by the build manifest
+        self.incremental = incremental
+        self.start_offset = 0
+        self.known_words = set()
+        # Words of decks the learner already owns are never translated or emitted
+        self.known_from = known_from or []
+        # Console output and metrics
+        self.quiet = quiet
+        self.verbose = verbose
+        self.metrics_out = metrics_out
+        self.metrics = Metrics()
+        # translator is a backend name, created with translator_options (e.g. url and timeouts
+        # for libretranslate), or a translator shared with other generators
+        if isinstance(translator, str):
+            translator = create_translator(translator, source_lang, target_lang, **(translator_options or {}))
+        self.translator = translator
+        # Optional offline dictionary for single words; misses go to the translator. A
+        # dictionary shared with other generators is passed in as a DictionaryTranslator and left open
+        self.owns_dictionary = isinstance(dictionary, str)
+        if self.owns_dictionary:
+            dictionary = DictionaryTranslator(dictionary.format(source=source_lang, target=target_lang))
+        self.dictionary = dictionary or None
+        # Packs many words and sentences into one request of up to batch_chars
+        self.batch_chars = batch_chars
+        self.workers = max(1, workers)
+        self.rate_limiter = TokenBucket(rate_limit) if rate_limit else None
+        self.batch_translator = BatchTranslator(self.translator, max_chars=batch_chars,
+                                                rate_limiter=self.rate_limiter, retries=retries,
+                                                metrics=self.metrics)
+        # Persistent translation cache, disabled when cache_file is None; a cache
+        # shared with other generators is passed in as cache and left open
+        self.owns_cache = cache is None
+        if cache is None and cache_file:
+            cache = TranslationCache(cache_file, cache_size)
+        self.cache = cache
+        # Pronunciation clips of the source words, disabled without audio; a
+        # synthesizer shared with other generators is passed in as speech and left running
+        self.owns_speech = speech is None
+        if speech is None and audio:
+            speech = SpeechSynthesizer(media_cache, tts_voice, tts_processes)
+        self.speech = speech
+        self.media_files = set()
+        # IDs are derived from the deck name and language pair, so re-runs update the same deck
+        self.deck_id = stable_id('deck', deck_name, source_lang, target_lang)
         self.deck = genanki.Deck(self.deck_id, deck_name)
         
+        # Translation requests actually made vs. one word + one sentence per new word
+        self.translation_calls = 0
+        self.naive_translation_calls = 0
+        
         # Language name mapping for NLTK tokenization
-        self.lang_map = {
-            'ru': 'russian', 'en': 'english', 'es': 'spanish', 'fr': 'french',
-            'de': 'german', 'it': 'italian', 'pt': 'portuguese', 'nl': 'dutch',
-            'pl': 'polish', 'cs': 'czech', 'da': 'danish', 'et': 'estonian',
-            'fi': 'finnish', 'el': 'greek', 'no': 'norwegian', 'sl': 'slovene',
-            'sv': 'swedish', 'tr': 'turkish'
-        }
+        self.lang_map = NLTK_LANGUAGES
+        if stem:
+            # Checked now, not on the first word: there is no stemmer for every language
+            self.stem_language = stem_language(source_lang)
+        # Loaded now as well, so a language without a stopword list is refused before any work
+        self.stopword_set = load_stopwords(stopwords, self.lang_map.get(source_lang, source_lang))
         
         # Model for Source -> Target cards
+        src_tgt_fields = [
+            {'name': 'SourceWord'},
+            {'name': 'SourceExample'},
+            {'name': 'TargetWord'},
+            {'name': 'TargetExample'},
+        ]
+        extra_fields = self.forms_fields() + self.audio_fields()
+        src_tgt_fields += extra_fields
         self.model_src_tgt = genanki.Model(
-            random.randrange(1 << 30, 1 << 31),
+            model_id('src_tgt', source_lang, target_lang, extra_fields=extra_fields),
             f'{source_lang.upper()} to {target_lang.upper()} Model',
-            fields=[
-                {'name': 'SourceWord'},
-                {'name': 'SourceExample'},
-                {'name': 'TargetWord'},
-                {'name': 'TargetExample'},
-            ],
+            fields=src_tgt_fields,
             templates=[
                 {
                     'name': 'Card 1',
@@ -68,23 +275,24 @@ class BilingualAnkiDeckGenerator:
                               <div style="font-size: 18px; margin-top: 20px;">{{SourceExample}}</div>
                               <div style="margin-top: 20px;">
                                 <a href="https://conjugator.reverso.net/conjugation-''' + source_lang + '''-verb-{{SourceWord}}.html" target="_blank">Conjugation</a>
-                              </div>''',
+                              </div>''' + self.audio_template(),
                     'afmt': '''{{FrontSide}}
                               <hr id="answer">
                               <div style="font-size: 24px; color: blue; text-align: center;">{{TargetWord}}</div>
-                              <div style="font-size: 18px; margin-top: 20px;">{{TargetExample}}</div>''',
+                              <div style="font-size: 18px; margin-top: 20px;">{{TargetExample}}</div>''' + self.forms_template(),
                 },
             ])
         
         # Model for Target -> Source cards
+        tgt_src_fields = [
+            {'name': 'TargetWord'},
+            {'name': 'SourceWord'},
+            {'name': 'SourceExample'},
+        ]
         self.model_tgt_src = genanki.Model(
-            random.randrange(1 << 30, 1 << 31),
+            model_id('tgt_src', source_lang, target_lang),
             f'{target_lang.upper()} to {source_lang.upper()} Model',
-            fields=[
-                {'name': 'TargetWord'},
-                {'name': 'SourceWord'},
-                {'name': 'SourceExample'},
-            ],
+            fields=tgt_src_fields,
             templates=[
                 {
                     'name': 'Card 1',
@@ -100,14 +308,15 @@ class BilingualAnkiDeckGenerator:
             ])
         
         # Model for fill-in-the-blank cards
+        cloze_fields = [
+            {'name': 'SourceSentence'},
+            {'name': 'TargetSentence'},
+            {'name': 'MissingWord'},
+        ]
         self.model_cloze = genanki.Model(
-            random.randrange(1 << 30, 1 << 31),
+            model_id('cloze', source_lang, target_lang),
             f'{source_lang.upper()} Cloze Model',
-            fields=[
-                {'name': 'SourceSentence'},
-                {'name': 'TargetSentence'},
-                {'name': 'MissingWord'},
-            ],
+            fields=cloze_fields,
             templates=[
                 {
                     'name': 'Card 1',
@@ -120,86 +329,340 @@ class BilingualAnkiDeckGenerator:
                 },
             ])
 
+    def forms_fields(self):
+        """Return the fields added to the source word model: Forms when stemming"""
+        return [{'name': 'Forms'}] if self.stem else []
+
+    def forms_template(self):
+        """Return the back template line listing the Forms field, if there is one"""
+        if not self.stem:
+            return ''
+        return ('\n                              {{#Forms}}<div style="font-size: 16px; margin-top: 20px; '
+                'color: gray;">{{Forms}}</div>{{/Forms}}')
+
+    def audio_fields(self):
+        """Return the fields added to the source word model: Audio when the words are spoken"""
+        return [{'name': 'Audio'}] if self.speech else []
+
+    def audio_template(self):
+        """Return the front template line playing the Audio field, if there is one"""
+        return '\n                              {{Audio}}' if self.speech else ''
+
+    def audio_field(self, text):
+        """Speak text in the source language and return its [sound:] reference, empty if that failed"""
+        path = self.speech.submit(self.source_lang, text)
+        # Usually started when the word was found, so the clip is already written or nearly
+        if not self.speech.wait([path]):
+            return ''
+        self.media_files.add(path)
+        return f"[sound:{os.path.basename(path)}]"
+
+    def log(self, message):
+        """Print a message unless running in quiet mode"""
+        if not self.quiet:
+            print(message)
+
+    def detail(self, message):
+        """Print a per-sentence message in verbose mode"""
+        if self.verbose and not self.quiet:
+            print(message)
+
+    def open_input(self):
+        """Open the input file as text, positioned at start_offset bytes"""
+        f = open(self.input_file, 'rb')
+        f.seek(self.start_offset)
+        return io.TextIOWrapper(f, encoding='utf-8')
+
     def read_text(self):
         """Read text from file"""
-        with open(self.input_file, 'r', encoding='utf-8') as f:
+        with self.open_input() as f:
             return f.read()
 
+    def get_tokenizer(self, lang=None):
+        """Return the tokenizer for a language (default: source language), loading it once"""
+        lang_name = self.lang_map.get(lang or self.source_lang, 'english')
+        if lang_name not in self.tokenizers:
+            self.tokenizers[lang_name] = create_tokenizer(self.tokenizer_mode, lang_name)
+        return self.tokenizers[lang_name]
+
+    def tokenize_sentences(self, text):
+        """Split text into sentences"""
+        with self.metrics.timer('sentence_tokenization'):
+            return self.get_tokenizer().sentences(text)
+
+    def stream_sentences(self):
+        """Yield sentences while reading the input file chunk by chunk"""
+        carry = ''
+        with self.open_input() as f:
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                buffer = carry + chunk
+                sentences = self.tokenize_sentences(buffer)
+                carry = buffer
+                if sentences:
+                    # The last sentence may continue in the next chunk, so carry its
+                    # raw text (including trailing whitespace) over instead of yielding it
+                    last = sentences.pop()
+                    carry = buffer[buffer.rfind(last):]
+                    yield from sentences
+                
+                # The carry is tokenized again with every chunk, so it is kept bounded:
+                # a sentence longer than the limit is cut at its last whitespace
+                if len(carry) > MAX_CARRY_CHUNKS * self.chunk_size:
+                    match = re.search(r'\s\S*\Z', carry)
+                    cut = match.start() if match and match.start() else len(carry)
+                    yield from self.tokenize_sentences(carry[:cut])
+                    carry = carry[cut:]
+        
+        if carry.strip():
+            yield from self.tokenize_sentences(carry)
+
+    def read_sentences(self):
+        """Return the sentences of the input file, as a lazy generator in streaming mode"""
+        if self.stream:
+            self.log(f"Streaming text file: {self.input_file} ({self.chunk_size} characters per chunk)...")
+            return self.stream_sentences()
+        
+        self.log(f"Reading text file: {self.input_file}...")
+        text = self.read_text()
+        
+        self.log(f"Tokenizing sentences (source language: {self.source_lang})...")
+        sentences = self.tokenize_sentences(text)
+        self.log(f"Found {len(sentences)} sentences")
+        return sentences
+
+    def word_key(self, word):
+        """Return the key a word is grouped under: its stem when stemming, else the word itself"""
+        if not self.stem:
+            return word
+        key = self.word_keys.get(word)
+        if key is None:
+            if self.stemmer is None:
+                from nltk.stem.snowball import SnowballStemmer
+                self.stemmer = SnowballStemmer(self.stem_language)
+            key = self.word_keys[word] = self.stemmer.stem(word)
+        return key
+
+    def word_forms(self, word):
+        """Return the forms seen for a word's group, comma separated (empty without stemming)"""
+        if not self.stem or self.vocabulary is None:
+            return ''
+        return ', '.join(self.vocabulary.forms(self.word_key(word)))
+
     def extract_words_from_sentence(self, sentence):
         """Extract words from a single sentence"""
-        # Get language name for NLTK
-        lang_name = self.lang_map.get(self.source_lang, 'english')
+        with self.metrics.timer('word_extraction'):
+            return extract_words(sentence, self.get_tokenizer())
+
+    def iter_sentence_words(self, sentences):
+        """Yield (sentence, words) pairs in text order, extracting words on a process pool if enabled"""
+        if self.processes <= 1:
+            for sentence in sentences:
+                yield sentence, self.extract_words_from_sentence(sentence)
+            return
         
-        try:
-            words = word_tokenize(sentence, language=lang_name)
-        except:
-            # Fallback to basic split if language not supported
-            words = sentence.split()
-        
-        clean_words = []
-        for word in words:
-            # Clean word and filter out punctuation
-            clean_word = re.sub(r'[^\w]', '', word).lower()
-            if len(clean_word) > 2 and clean_word.isalpha():
-                clean_words.append((clean_word, word))  # (cleaned, original)
-        return clean_words
+        # Imported here: multiprocessing adds noticeably to startup time
+        from concurrent.futures import ProcessPoolExecutor
+        
+        lang_name = self.lang_map.get(self.source_lang, 'english')
+        sentences = iter(sentences)
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.processes) as pool:
+            while True:
+                # Keep a bounded number of shards in flight
+                while len(pending) < 2 * self.processes:
+                    shard = list(islice(sentences, self.shard_size))
+                    if not shard:
+                        break
+                    pending.append((shard, pool.submit(extract_words_from_shard, shard,
+                                                       self.tokenizer_mode, lang_name)))
+                if not pending:
+                    return
+                
+                # Shards are merged in submission order, so first occurrences
+                # (and therefore the new words per sentence) match the serial run
+                shard, future = pending.popleft()
+                with self.metrics.timer('word_extraction'):
+                    shard_words = future.result()
+                yield from zip(shard, shard_words)
 
     def translate_text(self, text):
         """Translate text from source to target language"""
-        try:
-            # Split long texts into chunks (Google Translate has limits)
-            if len(text) > 500:
-                return self.translator.translate(text[:500]) + "..."
-            return self.translator.translate(text)
-        except Exception as e:
-            print(f"Translation error: {e}")
-            return "[Translation Error]"
+        self.translation_calls += 1
+        return self.translate_units([text])[text]
+
+    def note_tags(self, kind):
+        """Return the tags for a note of the given kind (forward, reverse or cloze)"""
+        if kind == 'cloze':
+            return ['cloze', 'exercise', self.source_lang, self.target_lang]
+        tags = ['vocabulary', self.source_lang, self.target_lang]
+        if kind == 'reverse':
+            tags.append('reverse')
+        return tags
+
+    def note_guid(self, kind, source_word):
+        """Return a stable note GUID for a word, so re-runs update instead of duplicating notes"""
+        import genanki
+        return genanki.guid_for(self.deck_id, kind, source_word)
+
+    def plan_sentence(self, sentence, new_words):
+        """Collect the unique texts that need translating for one sentence"""
+        # The sentence is needed once, however many new words it contains
+        return list(dict.fromkeys([sentence] + new_words))
+
+    def translate_units(self, units):
+        """Translate every unit once and return a text -> translation map"""
+        translations = {}
+        missing = []
+        for unit in units:
+            # Single words are looked up in the local dictionary first
+            if self.dictionary and unit.isalpha():
+                found = self.dictionary.lookup(unit)
+                if found is not None:
+                    translations[unit] = found
+                    continue
+            cached = None
+            if self.cache:
+                cached = self.cache.get(self.source_lang, self.target_lang, unit)
+            if cached is not None:
+                translations[unit] = cached
+            else:
+                missing.append(unit)
+        
+        # Everything not cached goes out in as few packed requests as possible
+        with self.metrics.timer('translation'):
+            results = self.batch_translator.translate_batch(missing) if missing else []
+        for unit, translation in zip(missing, results):
+            if not translation:
+                translations[unit] = "[Translation Error]"
+                continue
+            translations[unit] = translation
+            if self.cache:
+                self.cache.set(self.source_lang, self.target_lang, unit, translation)
+        return translations
+
+    def submit_window(self, executor, window):
+        """Start translating a window of (sentence, new_words, tokens) in one batch on the thread pool"""
+        units = []
+        for sentence, new_words, tokens in window:
+            units.extend(self.plan_sentence(sentence, new_words))
+            self.naive_translation_calls += 2 * len(new_words)
+        units = list(dict.fromkeys(units))
+        self.translation_calls += len(units)
+        return window, executor.submit(self.translate_units, units)
+
+    def add_note(self, note):
+        """Add a note to the deck, or write it out right away with the bulk writer"""
+        if self.writer:
+            with self.metrics.timer('packaging'):
+                self.writer.add_note(note)
+        else:
+            self.deck.add_note(note)
+        self.notes_written += 1
+        if self.journal_notes is not None:
+            self.journal_notes.append([self.note_kind(note.model), note.guid, note.fields, note.tags])
+    
+    def note_models(self):
+        """Return the note model of every note kind"""
+        return {'forward': self.model_src_tgt, 'reverse': self.model_tgt_src, 'cloze': self.model_cloze}
+    
+    def note_kind(self, model):
+        """Return the kind (forward, reverse or cloze) of a note model"""
+        return next(kind for kind, kind_model in self.note_models().items() if kind_model is model)
+
+    def checkpoint(self, journal, window, cursor):
+        """Journal a finished window: its new words and notes, and the sentence to continue from"""
+        seen = [self.word_key(word) for _, new_words, _ in window for word in new_words]
+        journal.checkpoint(cursor, seen, self.journal_notes)
+        self.journal_notes = []
+    
+    def add_sentence_notes(self, window, translations):
+        """Add the notes of a translated window, sentence by sentence in text order"""
+        added = 0
+        for sentence, new_words, tokens in window:
+            # Collect all cards for this sentence
+            src_tgt_cards = []
+            tgt_src_cards = []
+            cloze_cards = []
+            
+            for word in new_words:
+                with self.metrics.timer('note_construction'):
+                    src_tgt_card, tgt_src_card, cloze_card = self.create_cards_for_word(
+                        word, sentence, translations, tokens[word])
+                
+                if src_tgt_card:
+                    src_tgt_cards.append(src_tgt_card)
+                if tgt_src_card:
+                    tgt_src_cards.append(tgt_src_card)
+                if cloze_card:
+                    cloze_cards.append(cloze_card)
+            
+            # Add cards in proper learning order:
+            # First all Source -> Target
+            for card in src_tgt_cards:
+                self.add_note(card)
+                added += 1
+            
+            # Then all Target -> Source
+            for card in tgt_src_cards:
+                self.add_note(card)
+                added += 1
+            
+            # Finally all Cloze cards
+            for card in cloze_cards:
+                self.add_note(card)
+                added += 1
+        return added
 
-    def create_cards_for_word(self, source_word, sentence):
-        """Create all three card types for a single word"""
+    def create_cards_for_word(self, source_word, sentence, translations=None, token=None):
+        """Create all three card types for a single word (token: its first Token in the sentence)"""
+        import genanki
+        
         try:
-            # Translate word and sentence
-            target_word = self.translate_text(source_word)
-            target_sentence = self.translate_text(sentence)
+            # Translate word and sentence, unless the sentence plan already did
+            if translations is None:
+                translations = self.translate_units(self.plan_sentence(sentence, [source_word]))
+            target_word = translations[source_word]
+            target_sentence = translations[sentence]
             
             # 1. Source -> Target card
             note_src_tgt = genanki.Note(
                 model=self.model_src_tgt,
-                fields=[source_word, sentence, target_word, target_sentence],
-                tags=['vocabulary', self.source_lang, self.target_lang]
+                fields=[source_word, sentence, target_word, target_sentence]
+                       + ([self.word_forms(source_word)] if self.stem else [])
+                       + ([self.audio_field(source_word)] if self.speech else []),
+                tags=self.note_tags('forward'),
+                guid=self.note_guid('forward', source_word)
             )
             
             # 2. Target -> Source card
             note_tgt_src = genanki.Note(
                 model=self.model_tgt_src,
                 fields=[target_word, source_word, sentence],
-                tags=['vocabulary', self.source_lang, self.target_lang, 'reverse']
+                tags=self.note_tags('reverse'),
+                guid=self.note_guid('reverse', source_word)
             )
             
-            # 3. Cloze card - find the word in sentence and replace with [...]
-            lang_name = self.lang_map.get(self.source_lang, 'english')
+            # 3. Cloze card - replace the word's span in the sentence with [...]
+            if token is None:
+                token = next((t for t in self.extract_words_from_sentence(sentence)
+                              if t.clean == source_word), None)
             
-            try:
-                words_in_sentence = word_tokenize(sentence, language=lang_name)
-            except:
-                words_in_sentence = sentence.split()
-            
-            word_to_replace = None
-            for w in words_in_sentence:
-                if re.sub(r'[^\w]', '', w).lower() == source_word:
-                    word_to_replace = w
-                    break
-            
-            if word_to_replace:
-                sentence_with_blank = sentence.replace(word_to_replace, '[...]', 1)
-                target_with_bold = target_sentence.replace(
-                    target_word, f"<b>{target_word}</b>", 1
+            if token:
+                sentence_with_blank = sentence[:token.start] + '[...]' + sentence[token.end:]
+                # Bold the translation only where it stands as a whole word
+                target_with_bold = re.sub(
+                    rf'(?<!\w){re.escape(target_word)}(?!\w)',
+                    lambda match: f"<b>{match.group(0)}</b>", target_sentence, count=1
                 )
                 
                 note_cloze = genanki.Note(
                     model=self.model_cloze,
                     fields=[sentence_with_blank, target_with_bold, source_word],
-                    tags=['cloze', 'exercise', self.source_lang, self.target_lang]
+                    tags=self.note_tags('cloze'),
+                    guid=self.note_guid('cloze', source_word)
                 )
             else:
                 note_cloze = None
@@ -210,86 +673,530 @@ class BilingualAnkiDeckGenerator:
             print(f"Error creating cards for '{source_word}': {e}")
             return None, None, None
 
-    def generate_deck(self):
-        """Main method to generate the Anki deck"""
-        print(f"Reading text file: {self.input_file}...")
-        text = self.read_text()
+    def start_incremental_build(self):
+        """Load the build manifest and skip the part of the input it already covers"""
+        manifest = DeckManifest(manifest_path_for(self.output_file))
+        if manifest.covers(self.input_file, self.deck_id, self.source_lang, self.target_lang):
+            self.start_offset = manifest.input_bytes
+            self.known_words.update(manifest.seen_words)
+            self.log(f"Build manifest found: skipping the first {self.start_offset} bytes "
+                     f"and {len(self.known_words)} known words")
+        elif manifest.exists:
+            self.log("Build manifest does not match the input file, rebuilding from scratch")
+        return manifest
+
+    def load_known_decks(self):
+        """Add the source words of existing decks to the known words"""
+        for path in self.known_from:
+            words = load_known_words(path)
+            keys = {self.word_key(word) for word in words}
+            self.known_words.update(keys)
+            self.log(f"Known deck {path}: {len(words)} words skipped")
+    
+    def journal_run(self, input_bytes):
+        """Describe this run, so a journal is only resumed by the same run"""
+        return {
+            'input_file': os.path.abspath(self.input_file),
+            'input_bytes': input_bytes,
+            'input_tail_sha1': file_tail_hash(self.input_file, input_bytes),
+            'start_offset': self.start_offset,
+            'deck_id': self.deck_id,
+            'source_lang': self.source_lang,
+            'target_lang': self.target_lang,
+            'tokenizer': self.tokenizer_mode,
+            'top_n': self.top_n,
+            'min_count': self.min_count,
+            'stopwords': self.stopwords,
+            'stem': self.stem,
+            'known_from': list(self.known_from),
+            'plan_examples': self.plan_examples,
+            'audio': self.speech is not None,
+        }
+    
+    def open_journal(self, input_bytes):
+        """Open the run journal and, when resuming, replay its notes
         
-        print(f"Tokenizing sentences (source language: {self.source_lang})...")
-        lang_name = self.lang_map.get(self.source_lang, 'english')
+        Returns the journal and the (cursor, seen_words, notes) state of the resumed run, or None.
+        """
+        import genanki
+        journal = RunJournal(self.journal_file)
+        run = self.journal_run(input_bytes)
+        state = journal.load(run) if self.resume else None
+        if self.resume and state is None:
+            self.log("No journal of this run to resume, starting from the beginning")
+        journal.open(run, resume=state is not None)
         
-        try:
-            sentences = sent_tokenize(text, language=lang_name)
-        except:
-            # Fallback to basic sentence splitting
-            sentences = [s.strip() for s in text.split('.') if s.strip()]
+        if state:
+            cursor, seen_words, notes = state
+            models = self.note_models()
+            for kind, guid, fields, tags in notes:
+                if self.speech and kind == 'forward':
+                    # Clips missing from the media cache are spoken again, failed ones retried
+                    fields[-1] = self.audio_field(fields[0])
+                self.add_note(genanki.Note(model=models[kind], fields=fields, tags=tags, guid=guid))
+            self.log(f"Resuming after sentence {cursor}: {len(seen_words)} words and "
+                     f"{len(notes)} notes restored from {journal.path}")
+        self.journal_notes = []
+        return journal, state
+    
+    def build_vocabulary(self):
+        """Pre-pass: index every word of the input and select the vocabulary to learn"""
+        self.log("Building vocabulary index...")
+        sentences = self.read_sentences()
+        # Without streaming, keep the token tables so the main pass needn't tokenize again
+        sentence_words = [] if isinstance(sentences, list) else None
+        
+        index = VocabularyIndex()
+        planner = ExamplePlanner() if self.plan_examples else None
+        for sentence_id, (sentence, tokens) in enumerate(self.iter_sentence_words(sentences)):
+            words = [token.clean for token in tokens]
+            keys = [self.word_key(word) for word in words]
+            index.add_sentence(sentence_id, words, keys)
+            if planner:
+                planner.add_sentence(sentence_id, sentence, keys)
+            if sentence_words is not None:
+                sentence_words.append((sentence, tokens))
+        
+        stopwords = {self.word_key(word) for word in self.stopword_set}
+        selected = index.select(self.top_n, self.min_count, stopwords, exclude=self.known_words)
+        self.vocabulary = index
+        self.log(f"Vocabulary: {len(index)} distinct words in {index.sentences} sentences, "
+                 f"{len(selected)} selected")
+        
+        if planner:
+            # Only the planned sentences are walked (and translated) in the main pass
+            examples = planner.plan(selected)
+            first_examples = {index.first_sentence(key) for key in selected}
+            self.log(f"Example planner: {len(examples)} example sentences, {planner.cost(examples)} characters "
+                     f"(first occurrences: {len(first_examples)} sentences, {planner.cost(first_examples)} characters)")
+            if sentence_words is None:
+                sentence_words = self.iter_sentence_words(self.read_sentences())
+            sentence_words = [item for sentence_id, item in enumerate(sentence_words) if sentence_id in examples]
+        return selected, sentence_words
+
+    def prepare_sentences(self):
+        """Load the known words and return (sentence_words, selected_words) for the main pass"""
+        self.load_known_decks()
         
-        print(f"Found {len(sentences)} sentences")
+        # Optional vocabulary selection; None means every word is learned
+        selected_words = None
+        sentence_words = None
+        if self.top_n or self.min_count > 1 or self.stopwords or self.stem or self.plan_examples:
+            selected_words, sentence_words = self.build_vocabulary()
+        
+        if sentence_words is None:
+            sentences = self.read_sentences()
+            sentence_words = self.iter_sentence_words(sentences)
+        return sentence_words, selected_words
+    
+    def generate_deck(self, prepared=None, package=True):
+        """Main method to generate the Anki deck
+        
+        prepared: (sentence_words, selected_words) of the same input, prepared by another generator
+        package: write the .apkg file, otherwise the caller packages self.deck and then
+                 removes the run journal
+        """
+        try:
+            self._generate_deck(prepared, package)
+        finally:
+            if self.writer:
+                # Failed or interrupted: the journal keeps the notes, not the partial collection
+                self.writer.discard()
+                self.writer = None
+    
+    def _generate_deck(self, prepared, package):
+        manifest = self.start_incremental_build() if self.incremental else None
+        input_bytes = os.path.getsize(self.input_file)
+        if manifest and self.start_offset >= input_bytes:
+            self.log("No new text since the last build, nothing to do.")
+            return
+        sentence_words, selected_words = prepared or self.prepare_sentences()
+        # The sentence count is only known up front when not streaming
+        total = f"/{len(sentence_words)}" if isinstance(sentence_words, list) else ""
+        progress = ProgressReporter(total=len(sentence_words) if total else None,
+                                    enabled=not (self.quiet or self.verbose))
         
-        # Track words we've already seen
-        seen_words = set()
+        # Track words we've already seen (including those of earlier builds)
+        seen_words = set(self.known_words)
         total_cards = 0
+        sentence_count = 0
         
-        # Process each sentence one by one
-        for i, sentence in enumerate(sentences):
-            print(f"\nProcessing sentence {i+1}/{len(sentences)}: {sentence[:50]}...")
-            
-            # Extract words from this sentence
-            words_in_sentence = self.extract_words_from_sentence(sentence)
+        if self.writer_mode == 'bulk':
+            self.writer = ApkgWriter(self.deck, [self.model_src_tgt, self.model_tgt_src, self.model_cloze],
+                                     self.output_file)
+        
+        # Sentences before the cursor were finished by the interrupted run being resumed
+        journal, resumed = self.open_journal(input_bytes)
+        cursor = 0
+        if resumed:
+            cursor = resumed[0]
+            seen_words.update(resumed[1])
+            total_cards = len(resumed[2])
+        
+        # Sentences waiting to be translated together, and windows being
+        # translated on the thread pool (kept in text order)
+        window = []
+        window_chars = 0
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        
+        # Process each sentence one by one (words may be extracted ahead on other processes)
+        for i, (sentence, words_in_sentence) in enumerate(sentence_words):
+            sentence_count += 1
+            progress.update(sentence_count, words=len(seen_words), cards=total_cards)
+            if i < cursor:
+                continue
+            self.detail(f"\nProcessing sentence {i+1}{total}: {sentence[:50]}...")
             
-            # Find NEW words (not seen before)
+            # Find NEW words (not seen before), keeping the token of their first occurrence
             new_words = []
-            for clean_word, original_word in words_in_sentence:
-                if clean_word not in seen_words:
-                    new_words.append(clean_word)
-                    seen_words.add(clean_word)
+            tokens = {}
+            for token in words_in_sentence:
+                # With stemming, seen_words and the vocabulary hold group keys
+                key = self.word_key(token.clean)
+                if selected_words is not None and key not in selected_words:
+                    continue
+                if key not in seen_words:
+                    new_words.append(token.clean)
+                    if self.speech:
+                        # Spoken by the worker processes while the sentence is translated
+                        self.speech.submit(self.source_lang, token.clean)
+                    tokens[token.clean] = token
+                    seen_words.add(key)
             
             if not new_words:
-                print(f"  No new words in this sentence, skipping...")
+                self.detail(f"  No new words in this sentence, skipping...")
                 continue
             
-            print(f"  Found {len(new_words)} new word(s): {', '.join(new_words)}")
+            self.detail(f"  Found {len(new_words)} new word(s): {', '.join(new_words)}")
             
-            # Collect all cards for this sentence
-            src_tgt_cards = []
-            tgt_src_cards = []
-            cloze_cards = []
+            # Queue the sentence; translation happens per window of sentences
+            window.append((sentence, new_words, tokens))
+            window_chars += sum(len(unit) + 1 for unit in self.plan_sentence(sentence, new_words))
+            if window_chars >= self.batch_chars:
+                pending.append((self.submit_window(executor, window), i + 1))
+                window = []
+                window_chars = 0
             
-            for word in new_words:
-                src_tgt_card, tgt_src_card, cloze_card = self.create_cards_for_word(word, sentence)
-                
-                if src_tgt_card:
-                    src_tgt_cards.append(src_tgt_card)
-                if tgt_src_card:
-                    tgt_src_cards.append(tgt_src_card)
-                if cloze_card:
-                    cloze_cards.append(cloze_card)
-            
-            # Add cards in proper learning order:
-            # First all Source -> Target
-            for card in src_tgt_cards:
-                self.deck.add_note(card)
-                total_cards += 1
-            
-            # Then all Target -> Source
-            for card in tgt_src_cards:
-                self.deck.add_note(card)
-                total_cards += 1
-            
-            # Finally all Cloze cards
-            for card in cloze_cards:
-                self.deck.add_note(card)
-                total_cards += 1
+            # Keep a bounded number of windows in flight, adding notes in order
+            while len(pending) > 2 * self.workers:
+                (window_done, future), window_end = pending.popleft()
+                total_cards += self.add_sentence_notes(window_done, future.result())
+                self.checkpoint(journal, window_done, window_end)
+        
+        if window:
+            pending.append((self.submit_window(executor, window), sentence_count))
+        while pending:
+            (window_done, future), window_end = pending.popleft()
+            total_cards += self.add_sentence_notes(window_done, future.result())
+            self.checkpoint(journal, window_done, window_end)
+        executor.shutdown()
+        progress.finish(words=len(seen_words), cards=total_cards)
+        
+        self.log(f"\n{'='*60}")
+        if package:
+            self.log(f"Saving deck to {self.output_file}...")
+            with self.metrics.timer('packaging'):
+                media_files = self.speech.wait(sorted(self.media_files)) if self.speech else []
+                if self.writer:
+                    self.writer.close(media_files)
+                    self.writer = None
+                else:
+                    import genanki
+                    genanki.Package(self.deck, media_files=media_files).write_to_file(self.output_file)
+        if manifest:
+            manifest.record_build(self.input_file, self.deck_id, self.deck_name,
+                                  self.source_lang, self.target_lang, self.start_offset,
+                                  input_bytes, seen_words, sentence_count, total_cards)
+            manifest.save()
+            if self.start_offset:
+                self.log(f"Update deck with the new notes only, import it into Anki to extend the deck.")
+        if package:
+            journal.remove()
+        else:
+            # Kept for --resume until the caller has written the package
+            journal.close()
+        self.journal_notes = None
+        self.log(f"Done! Deck created successfully.")
+        self.log(f"Deck name: {self.deck_name}")
+        self.log(f"Source language: {self.source_lang}")
+        self.log(f"Target language: {self.target_lang}")
+        self.log(f"Total unique words: {len(seen_words)}")
+        self.log(f"Total cards created: {total_cards}")
+        self.log(f"Translation calls: {self.translation_calls} "
+                 f"(without sentence deduplication: {self.naive_translation_calls}), "
+                 f"translator requests: {self.batch_translator.requests}")
+        self.log("Time spent: " + ", ".join(
+            f"{name.replace('_', ' ')} {self.metrics.seconds(name):.2f}s"
+            for name in ('sentence_tokenization', 'word_extraction', 'translation',
+                         'note_construction', 'packaging')))
+        if self.dictionary:
+            self.log(f"Dictionary: {self.dictionary.summary()}")
+            if self.owns_dictionary:
+                self.dictionary.close()
+        if self.speech:
+            self.log(f"Audio: {self.speech.summary()}")
+            if self.owns_speech:
+                self.speech.close()
+        if self.cache:
+            self.log(f"Translation cache: {self.cache.summary()}")
+            if self.owns_cache:
+                self.cache.close()
         
-        print(f"\n{'='*60}")
-        print(f"Saving deck to {self.output_file}...")
-        genanki.Package(self.deck).write_to_file(self.output_file)
-        print(f"Done! Deck created successfully.")
-        print(f"Deck name: {self.deck_name}")
-        print(f"Source language: {self.source_lang}")
-        print(f"Target language: {self.target_lang}")
-        print(f"Total unique words: {len(seen_words)}")
-        print(f"Total cards created: {total_cards}")
+        if self.metrics_out:
+            self.metrics.count('sentences', sentence_count)
+            self.metrics.count('unique_words', len(seen_words))
+            self.metrics.count('cards', total_cards)
+            self.metrics.count('translation_units', self.translation_calls)
+            self.metrics.count('translation_units_without_dedup', self.naive_translation_calls)
+            if self.dictionary:
+                self.metrics.count('dictionary_hits', self.dictionary.hits)
+                self.metrics.count('dictionary_misses', self.dictionary.misses)
+            if self.cache:
+                self.metrics.count('cache_hits', self.cache.hits)
+                self.metrics.count('cache_misses', self.cache.misses)
+            self.metrics.write_json(self.metrics_out, deck_name=self.deck_name,
+                                    source_lang=self.source_lang, target_lang=self.target_lang,
+                                    input_file=self.input_file, output_file=self.output_file)
+            self.log(f"Metrics written to {self.metrics_out}")
+
+
+def target_output_file(output_file, target_lang):
+    """Return the output file of one target language, e.g. deck.apkg -> deck_de.apkg"""
+    base, extension = os.path.splitext(output_file)
+    return f"{base}_{target_lang}{extension}"
+
+
+def shared_speech(options):
+    """Return one speech synthesizer for all generators built with these options, or None without audio"""
+    if not options.get('audio'):
+        return None
+    return SpeechSynthesizer(options.get('media_cache', DEFAULT_MEDIA_CACHE_DIR), options.get('tts_voice'),
+                             options.get('tts_processes', DEFAULT_TTS_PROCESSES))
+
+
+class MultiTargetDeckGenerator:
+    """Build decks for several target languages from one pass of tokenization
+    
+    The input is read, tokenized and its vocabulary selected once. Then one
+    BilingualAnkiDeckGenerator per target language translates and builds its
+    notes, all of them at the same time, so the total time is close to that of
+    the slowest target. The decks are written to one .apkg per target, or as
+    subdecks of deck_name into a single package.
+    """
+    
+    def __init__(self, input_file, target_langs, source_lang='ru',
+                 deck_name='Language Learning Deck', output_file="language_deck.apkg",
+                 cache_file=DEFAULT_CACHE_FILE, cache_size=DEFAULT_MAX_ENTRIES,
+                 rate_limit=0, subdecks=False, quiet=False, metrics_out=None, **options):
+        # options: any other BilingualAnkiDeckGenerator setting, e.g. workers=4
+        options.pop('verbose', None)
+        if options.get('incremental'):
+            raise ValueError("Incremental builds need a single target language")
+        if subdecks and options.get('writer', 'genanki') != 'genanki':
+            raise ValueError("Subdecks are written with the genanki writer only")
+        
+        self.target_langs = list(target_langs)
+        self.deck_name = deck_name
+        self.output_file = output_file
+        self.subdecks = subdecks
+        self.quiet = quiet
+        # All targets share one translation cache, one request rate limit and the clips of the source words
+        self.cache = TranslationCache(cache_file, cache_size) if cache_file else None
+        self.rate_limiter = TokenBucket(rate_limit) if rate_limit else None
+        self.speech = shared_speech(options)
+        
+        self.generators = []
+        for target_lang in self.target_langs:
+            if subdecks:
+                name, output = f"{deck_name}::{target_lang}", output_file
+            else:
+                name, output = f"{deck_name} ({target_lang})", target_output_file(output_file, target_lang)
+            generator = BilingualAnkiDeckGenerator(
+                input_file, source_lang=source_lang, target_lang=target_lang,
+                deck_name=name, output_file=output, cache_file=None, cache=self.cache, speech=self.speech,
+                # Progress lines of concurrent targets would interleave, a summary is printed instead
+                quiet=True, verbose=False,
+                metrics_out=metrics_out and target_output_file(metrics_out, target_lang),
+                **options)
+            if subdecks:
+                # Targets share the output file, but each needs a journal of its own
+                generator.journal_file = journal_path_for(target_output_file(output_file, target_lang))
+            generator.rate_limiter = self.rate_limiter
+            generator.batch_translator.rate_limiter = self.rate_limiter
+            self.generators.append(generator)
+    
+    def log(self, message):
+        """Print a message unless running in quiet mode"""
+        if not self.quiet:
+            print(message)
+    
+    def generate_decks(self):
+        """Tokenize once, then generate the deck of every target language concurrently"""
+        reader = self.generators[0]
+        self.log(f"Reading {reader.input_file} once for {len(self.generators)} target languages: "
+                 f"{', '.join(self.target_langs)}")
+        sentence_words, selected_words = reader.prepare_sentences()
+        # Every target walks the same token tables, so they are kept in memory
+        sentence_words = list(sentence_words)
+        for generator in self.generators[1:]:
+            generator.known_words = reader.known_words
+            generator.vocabulary = reader.vocabulary
+            generator.word_keys = reader.word_keys
+        self.log(f"Found {len(sentence_words)} sentences, translating...")
+        
+        prepared = (sentence_words, selected_words)
+        with ThreadPoolExecutor(max_workers=len(self.generators)) as executor:
+            futures = [executor.submit(generator.generate_deck, prepared, not self.subdecks)
+                       for generator in self.generators]
+            for future in futures:
+                future.result()
+        
+        if self.subdecks:
+            import genanki
+            self.log(f"Saving {len(self.generators)} subdecks to {self.output_file}...")
+            media_files = []
+            if self.speech:
+                media_files = self.speech.wait(sorted(set().union(
+                    *(generator.media_files for generator in self.generators))))
+            genanki.Package([generator.deck for generator in self.generators],
+                            media_files=media_files).write_to_file(self.output_file)
+            for generator in self.generators:
+                RunJournal(generator.journal_file).remove()
+        for generator in self.generators:
+            self.log(f"  {generator.target_lang}: {generator.notes_written} notes, "
+                     f"{generator.translation_calls} translation calls -> {generator.output_file}")
+        if self.cache:
+            self.log(f"Translation cache: {self.cache.summary()}")
+            self.cache.close()
+        if self.speech:
+            self.log(f"Audio: {self.speech.summary()}")
+            self.speech.close()
+        self.log("Done!")
+
+
+class MultiDeckGenerator:
+    """Build many decks in one process
+    
+    Each job (see deckJobs) is built by its own BilingualAnkiDeckGenerator,
+    deck_workers of them at the same time. The decks share the tokenizers,
+    one translator and dictionary per language pair, the translation cache and one global
+    request rate limit, so NLTK, punkt and the translator are set up once
+    instead of once per deck.
+    """
+    
+    def __init__(self, jobs, target_langs=('en',), source_lang='ru', deck_name='Language Learning Deck',
+                 cache_file=DEFAULT_CACHE_FILE, cache_size=DEFAULT_MAX_ENTRIES, rate_limit=0,
+                 deck_workers=4, quiet=False, metrics_out=None, translator='google',
+                 translator_options=None, dictionary=None, **options):
+        # options: any other BilingualAnkiDeckGenerator setting, e.g. workers=4
+        options.pop('verbose', None)
+        self.jobs = list(jobs)
+        self.target_langs = list(target_langs)
+        self.source_lang = source_lang
+        self.deck_name = deck_name
+        self.deck_workers = max(1, deck_workers)
+        self.quiet = quiet
+        self.metrics_out = metrics_out
+        self.translator_name = translator
+        self.translator_options = translator_options or {}
+        self.dictionary_path = dictionary
+        self.options = options
+        # Shared by all decks
+        self.cache = TranslationCache(cache_file, cache_size) if cache_file else None
+        self.rate_limiter = TokenBucket(rate_limit) if rate_limit else None
+        self.speech = shared_speech(options)
+        self.tokenizers = {}
+        self.translators = {}
+        self.dictionaries = {}
+        self._lock = threading.Lock()
+    
+    def log(self, message):
+        """Print a message unless running in quiet mode"""
+        if not self.quiet:
+            print(message)
+    
+    def get_translator(self, source_lang, target_lang):
+        """Return the translator shared by all decks of a language pair (thread safe, see translatorBackends)"""
+        with self._lock:
+            key = (source_lang, target_lang)
+            if key not in self.translators:
+                self.translators[key] = create_translator(self.translator_name, source_lang, target_lang,
+                                                          **self.translator_options)
+            return self.translators[key]
+    
+    def get_dictionary(self, source_lang, target_lang):
+        """Return the dictionary shared by all decks of a language pair, or None without --dictionary"""
+        if not self.dictionary_path:
+            return None
+        path = self.dictionary_path.format(source=source_lang, target=target_lang)
+        with self._lock:
+            # Opened (and its index built) once, not by every deck at the same time
+            if path not in self.dictionaries:
+                self.dictionaries[path] = DictionaryTranslator(path)
+            return self.dictionaries[path]
+    
+    def deck_builds(self):
+        """Expand the jobs into (input, output, deck name, source, target) builds, one per target language"""
+        for job in self.jobs:
+            name = os.path.splitext(os.path.basename(job['output']))[0]
+            targets = [job['target_lang']] if job.get('target_lang') else self.target_langs
+            for target_lang in targets:
+                output, deck_name = job['output'], job.get('deck_name') or f"{self.deck_name}::{name}"
+                if len(targets) > 1:
+                    output = target_output_file(output, target_lang)
+                    deck_name = f"{deck_name} ({target_lang})"
+                yield job['input'], output, deck_name, job.get('source_lang') or self.source_lang, target_lang
+    
+    def build_deck(self, input_file, output_file, deck_name, source_lang, target_lang, **overrides):
+        """Build one deck with the shared tokenizers, translator, dictionary, cache and rate limit
+        
+        overrides: BilingualAnkiDeckGenerator settings of this deck only, e.g. top_n=500
+        """
+        metrics_out = None
+        if self.metrics_out:
+            metrics_out = target_output_file(self.metrics_out, os.path.splitext(os.path.basename(output_file))[0])
+        generator = BilingualAnkiDeckGenerator(
+            input_file, source_lang=source_lang, target_lang=target_lang, deck_name=deck_name,
+            output_file=output_file, cache_file=None, cache=self.cache, speech=self.speech, quiet=True,
+            translator=self.get_translator(source_lang, target_lang),
+            dictionary=self.get_dictionary(source_lang, target_lang),
+            metrics_out=metrics_out, **dict(self.options, **overrides))
+        generator.tokenizers = self.tokenizers
+        generator.rate_limiter = self.rate_limiter
+        generator.batch_translator.rate_limiter = self.rate_limiter
+        generator.generate_deck()
+        return generator
+    
+    def generate_decks(self):
+        """Build every deck on the worker pool and return the number of decks that failed"""
+        builds = list(self.deck_builds())
+        self.log(f"Building {len(builds)} decks, {self.deck_workers} at a time...")
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.deck_workers) as executor:
+            futures = {executor.submit(self.build_deck, *build): build for build in builds}
+            for done, future in enumerate(as_completed(futures), 1):
+                input_file, output_file = futures[future][:2]
+                try:
+                    generator = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"[{done}/{len(builds)}] {input_file}: FAILED: {e}")
+                    continue
+                self.log(f"[{done}/{len(builds)}] {input_file} -> {output_file}: "
+                         f"{generator.notes_written} notes, {generator.translation_calls} translation calls, "
+                         f"{format_duration(generator.metrics.to_dict()['elapsed_seconds'])}")
+        for path, dictionary in self.dictionaries.items():
+            self.log(f"Dictionary {path}: {dictionary.summary()}")
+            dictionary.close()
+        if self.cache:
+            self.log(f"Translation cache: {self.cache.summary()}")
+            self.cache.close()
+        if self.speech:
+            self.log(f"Audio: {self.speech.summary()}")
+            self.speech.close()
+        self.log(f"Done! {len(builds) - failed} decks built" + (f", {failed} failed" if failed else ""))
+        return failed
 
 
 def main():
@@ -301,30 +1208,173 @@ Examples:
   python ankiDecksMaker.py --input russian_text.txt
   python ankiDecksMaker.py --input spanish.txt --source-lang es --target-lang en
   python ankiDecksMaker.py --input german.txt --source-lang de --target-lang en --deck-name "German Vocabulary"
+  python multiLanguageDecksMaker.py --input-dir texts/ --output-dir decks/ --deck-workers 8 --rate-limit 5
         """
     )
     
-    parser.add_argument('--input', '-i', required=True,
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument('--input', '-i',
                         help='Path to input text file')
+    inputs.add_argument('--input-dir',
+                        help='Build a deck for every .txt file of this directory, in one process')
+    inputs.add_argument('--decks', metavar='MANIFEST',
+                        help='Build the decks listed in this JSON manifest file, in one process')
+    parser.add_argument('--output-dir',
+                        help='Directory of the decks built with --input-dir (default: the input directory)')
+    parser.add_argument('--deck-workers', type=int, default=4,
+                        help='Decks built at the same time with --input-dir or --decks (default: 4)')
     parser.add_argument('--source-lang', '-s', default='ru',
                         help='Source language ISO 639-1 code (default: ru)')
     parser.add_argument('--target-lang', '-t', default='en',
-                        help='Target language ISO 639-1 code (default: en)')
+                        help='Target language ISO 639-1 code, or several separated by commas (default: en)')
     parser.add_argument('--deck-name', '-d', default='Language Learning Deck',
                         help='Name of the Anki deck (default: "Language Learning Deck")')
     parser.add_argument('--output', '-o', default='language_deck.apkg',
                         help='Output .apkg file path (default: language_deck.apkg)')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_FILE,
+                        help=f'Path of the persistent translation cache (default: {DEFAULT_CACHE_FILE})')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help=f'Maximum number of cached translations (default: {DEFAULT_MAX_ENTRIES})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Disable the persistent translation cache')
+    parser.add_argument('--batch-chars', type=int, default=DEFAULT_MAX_CHARS,
+                        help=f'Maximum characters packed into one translation request (default: {DEFAULT_MAX_CHARS})')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help='Number of concurrent translation threads (default: 1)')
+    parser.add_argument('--rate-limit', type=float, default=0,
+                        help='Maximum translator requests per second, 0 for no limit (default: 0)')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Retries with backoff when the translator throttles us (default: 3)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Read and process the input file in chunks instead of loading it whole')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Characters read per chunk in streaming mode (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only process text appended since the last build and write an update deck')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run from its last checkpoint (the <output>.journal.jsonl file)')
+    parser.add_argument('--metrics-out',
+                        help='Write timings, counters and translation latency histogram to this JSON file')
+    output_mode = parser.add_mutually_exclusive_group()
+    output_mode.add_argument('--quiet', '-q', action='store_true',
+                             help='Only print errors')
+    output_mode.add_argument('--verbose', '-v', action='store_true',
+                             help='Print every sentence and its new words instead of a progress line')
+    parser.add_argument('--processes', '-p', type=int, default=1,
+                        help='Worker processes for word extraction (default: 1)')
+    parser.add_argument('--tokenizer', choices=TOKENIZER_MODES, default='nltk',
+                        help='nltk (punkt, default) or regex (no NLTK needed)')
+    parser.add_argument('--top-n', type=int,
+                        help='Only learn the N most frequent words')
+    parser.add_argument('--min-count', type=int, default=1,
+                        help='Only learn words occurring at least this many times (default: 1)')
+    parser.add_argument('--stopwords',
+                        help='File with words to skip (one per line), or "nltk" for NLTK\'s stopword list')
+    parser.add_argument('--stem', action='store_true',
+                        help='Group inflected forms of a word (Snowball stemmer) and create cards once per group')
+    parser.add_argument('--plan-examples', action='store_true',
+                        help='Pick a small set of short example sentences covering all words and only translate those')
+    parser.add_argument('--audio', action='store_true',
+                        help=f'Add pronunciation clips of the source words, made offline with {DEFAULT_TTS_ENGINE}')
+    parser.add_argument('--tts-voice',
+                        help=f'{DEFAULT_TTS_ENGINE} voice of the clips (default: the source language code)')
+    parser.add_argument('--tts-processes', type=int, default=DEFAULT_TTS_PROCESSES,
+                        help=f'Worker processes synthesizing clips (default: {DEFAULT_TTS_PROCESSES})')
+    parser.add_argument('--media-cache', default=DEFAULT_MEDIA_CACHE_DIR,
+                        help=f'Directory of the synthesized clips, shared by all decks and runs (default: {DEFAULT_MEDIA_CACHE_DIR})')
+    parser.add_argument('--writer', choices=WRITERS, default='genanki',
+                        help='genanki (default) or bulk, which streams notes into the .apkg database as they are made')
+    parser.add_argument('--known-from', action='append', metavar='DECK',
+                        help='Existing .apkg deck or Anki collection whose words are skipped (can be given several times)')
+    parser.add_argument('--subdecks', action='store_true',
+                        help='With several target languages, write one package with a subdeck per language')
+    parser.add_argument('--translator', choices=sorted(TRANSLATOR_BACKENDS), default='google',
+                        help='Translator backend for sentences and dictionary misses (default: google)')
+    parser.add_argument('--translator-url', default=DEFAULT_LIBRETRANSLATE_URL,
+                        help=f'URL of the LibreTranslate compatible server (default: {DEFAULT_LIBRETRANSLATE_URL})')
+    parser.add_argument('--translator-api-key',
+                        help='API key for the LibreTranslate server')
+    parser.add_argument('--translator-timeout', type=float, default=DEFAULT_CONNECT_TIMEOUT,
+                        help=f'Seconds to wait for a connection to the translation server (default: {DEFAULT_CONNECT_TIMEOUT:g})')
+    parser.add_argument('--translator-read-timeout', type=float, default=DEFAULT_READ_TIMEOUT,
+                        help=f'Seconds to wait for a translation server answer (default: {DEFAULT_READ_TIMEOUT:g})')
+    parser.add_argument('--translator-concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Maximum simultaneous requests to the translation server (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--dictionary', metavar='FILE',
+                        help='Local tab-separated word<TAB>translation dictionary used for words before the translator '
+                             '({source} and {target} in the path are replaced by the language codes)')
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE,
+                        help=f'Sentences per word extraction task in multi-process mode (default: {DEFAULT_SHARD_SIZE})')
     
     args = parser.parse_args()
+    target_langs = [lang.strip() for lang in args.target_lang.split(',') if lang.strip()]
+    if len(target_langs) > 1 and not (args.input_dir or args.decks):
+        if args.incremental:
+            parser.error('--incremental needs a single target language')
+        if args.subdecks and args.writer != 'genanki':
+            parser.error('--subdecks is only supported with --writer genanki')
+    if args.audio and shutil.which(DEFAULT_TTS_ENGINE) is None:
+        parser.error(f'--audio needs {DEFAULT_TTS_ENGINE}, which was not found on the PATH')
+    
+    translator_options = {}
+    if args.translator == 'libretranslate':
+        translator_options = dict(url=args.translator_url, api_key=args.translator_api_key,
+                                  connect_timeout=args.translator_timeout,
+                                  read_timeout=args.translator_read_timeout,
+                                  concurrency=args.translator_concurrency)
     
-    generator = BilingualAnkiDeckGenerator(
+    options = dict(
         input_file=args.input,
         source_lang=args.source_lang,
-        target_lang=args.target_lang,
         deck_name=args.deck_name,
-        output_file=args.output
+        output_file=args.output,
+        cache_file=None if args.no_cache else args.cache,
+        cache_size=args.cache_size,
+        batch_chars=args.batch_chars,
+        workers=args.workers,
+        rate_limit=args.rate_limit,
+        retries=args.retries,
+        stream=args.stream,
+        chunk_size=args.chunk_size,
+        incremental=args.incremental,
+        resume=args.resume,
+        quiet=args.quiet,
+        metrics_out=args.metrics_out,
+        processes=args.processes,
+        shard_size=args.shard_size,
+        tokenizer=args.tokenizer,
+        top_n=args.top_n,
+        min_count=args.min_count,
+        stopwords=args.stopwords,
+        stem=args.stem,
+        plan_examples=args.plan_examples,
+        audio=args.audio,
+        tts_voice=args.tts_voice,
+        tts_processes=args.tts_processes,
+        media_cache=args.media_cache,
+        writer=args.writer,
+        known_from=args.known_from,
+        translator=args.translator,
+        translator_options=translator_options,
+        dictionary=args.dictionary
     )
-    generator.generate_deck()
+    try:
+        if args.input_dir or args.decks:
+            jobs = directory_jobs(args.input_dir, args.output_dir) if args.input_dir else load_jobs(args.decks)
+            del options['input_file'], options['output_file']
+            failed = MultiDeckGenerator(jobs, target_langs=target_langs, deck_workers=args.deck_workers,
+                                        **options).generate_decks()
+            if failed:
+                sys.exit(1)
+        elif len(target_langs) > 1:
+            MultiTargetDeckGenerator(target_langs=target_langs, subdecks=args.subdecks,
+                                     **options).generate_decks()
+        else:
+            BilingualAnkiDeckGenerator(target_lang=target_langs[0], verbose=args.verbose,
+                                       **options).generate_deck()
+    except KeyboardInterrupt:
+        print("\nInterrupted. Run again with --resume to continue from the last checkpoint.")
+        sys.exit(130)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+"""
+Rate Limiting and Retries for Translator Requests
+
+TokenBucket limits how many requests per second are sent to the translator,
+shared by all worker threads. call_with_retry retries a request with
+exponential backoff when the translator answers that we are sending too
+many requests.
+"""
+
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        # rate: tokens added per second, capacity: largest allowed burst
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, self.rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Block until the requested number of tokens is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def is_throttling_error(error):
+    """Check whether an exception means the translator is rate limiting us"""
+    name = type(error).__name__
+    message = str(error).lower()
+    return (name == 'TooManyRequests' or '429' in message
+            or 'too many requests' in message or 'rate limit' in message)
+
+
+def call_with_retry(func, retries=3, backoff=1.0, should_retry=is_throttling_error):
+    """Call func, retrying with exponential backoff and jitter on throttling errors"""
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= retries or not should_retry(e):
+                raise
+            delay = backoff * (2 ** attempt) * random.uniform(0.5, 1.0)
+            print(f"Translator is throttling ({e}), retrying in {delay:.1f}s...")
+            time.sleep(delay)
+            attempt += 1
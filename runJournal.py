@@ -0,0 +1,97 @@
+"""
+Run Journal for Resumable Deck Builds
+
+An append-only JSON lines file written next to the .apkg file while a deck
+is generated. The first line describes the run (input file, deck and
+options); every following line is a checkpoint written when a window of
+sentences has been translated and turned into notes: the sentence cursor,
+the newly seen words and the data of the new notes.
+
+When a run dies (network error, throttling, Ctrl-C), the journal is left
+behind and a run with --resume replays its notes and seen words and
+continues after the last checkpoint, without translating anything again.
+A checkpoint cut short by the crash is ignored. The journal is removed
+once the deck has been written.
+"""
+
+import json
+import os
+
+JOURNAL_VERSION = 1
+
+
+def journal_path_for(output_file):
+    """Return the journal path belonging to an .apkg output file"""
+    return os.path.splitext(output_file)[0] + '.journal.jsonl'
+
+
+class RunJournal:
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        # Bytes of the journal holding complete checkpoints, set by load()
+        self.valid_bytes = 0
+
+    @property
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self, run):
+        """Return (cursor, seen_words, notes) of the checkpoints of a matching run, or None"""
+        if not self.exists:
+            return None
+        cursor = 0
+        seen_words = set()
+        notes = []
+        with open(self.path, 'rb') as f:
+            header = f.readline()
+            try:
+                header = json.loads(header)
+            except ValueError:
+                return None
+            if header.get('version') != JOURNAL_VERSION or header.get('run') != run:
+                return None
+            valid_bytes = f.tell()
+            for line in f:
+                try:
+                    checkpoint = json.loads(line)
+                except ValueError:
+                    # Checkpoint cut short by the crash
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                cursor = checkpoint['cursor']
+                seen_words.update(checkpoint['seen'])
+                notes.extend(checkpoint['notes'])
+                valid_bytes += len(line)
+        self.valid_bytes = valid_bytes
+        return cursor, seen_words, notes
+
+    def open(self, run, resume=False):
+        """Start a new journal for run, or continue the loaded one after its last checkpoint"""
+        if resume and self.valid_bytes:
+            self.file = open(self.path, 'r+b')
+            self.file.truncate(self.valid_bytes)
+            self.file.seek(self.valid_bytes)
+        else:
+            self.file = open(self.path, 'wb')
+            self._write({'version': JOURNAL_VERSION, 'run': run})
+
+    def checkpoint(self, cursor, seen_words, notes):
+        """Append a checkpoint: sentences before cursor are done, with these new words and notes"""
+        self._write({'cursor': cursor, 'seen': list(seen_words), 'notes': notes})
+
+    def _write(self, data):
+        self.file.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n')
+        self.file.flush()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def remove(self):
+        """Close and delete the journal after a successful run"""
+        self.close()
+        if self.exists:
+            os.remove(self.path)
@@ -0,0 +1,109 @@
+"""
+Offline Text to Speech
+
+Pronunciation clips for the cards, made by a local offline engine
+(espeak-ng, run as a subprocess) on a pool of worker processes, while the
+translations are still running.
+
+Clips live in a content-addressed media cache: the file name is a hash of
+(language, text, voice), so a word spoken once is never synthesized again,
+in any deck or run. The clip files are then packed into the .apkg and
+referenced from the cards as [sound:<file name>].
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+
+DEFAULT_MEDIA_CACHE_DIR = 'media_cache'
+DEFAULT_TTS_ENGINE = 'espeak-ng'
+DEFAULT_TTS_PROCESSES = 2
+SYNTHESIS_TIMEOUT = 30
+
+
+def clip_name(lang, text, voice):
+    """Return the media file name of a clip, derived from what it says"""
+    digest = hashlib.sha1('\x1f'.join([lang, text, voice]).encode('utf-8')).hexdigest()
+    return f"tts_{digest[:24]}.wav"
+
+
+def synthesize_clip(engine, voice, text, path):
+    """Speak text into a WAV file (runs in a worker process)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        subprocess.run([engine, '-v', voice, '-w', tmp_path, text], check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=SYNTHESIS_TIMEOUT)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+class SpeechSynthesizer:
+    def __init__(self, cache_dir=DEFAULT_MEDIA_CACHE_DIR, voice=None, processes=DEFAULT_TTS_PROCESSES,
+                 engine=DEFAULT_TTS_ENGINE):
+        if shutil.which(engine) is None:
+            raise RuntimeError(f"Text to speech needs {engine}, which was not found on the PATH")
+        self.cache_dir = cache_dir
+        # Without a voice, the espeak-ng voice of the language code is used
+        self.voice = voice
+        self.processes = max(1, processes)
+        self.engine = engine
+        self.synthesized = 0
+        self.failed = 0
+        self._executor = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def submit(self, lang, text):
+        """Return the clip path of text, starting its synthesis unless it is cached"""
+        voice = self.voice or lang
+        path = os.path.join(self.cache_dir, clip_name(lang, text, voice))
+        with self._lock:
+            if path in self._pending or os.path.exists(path):
+                return path
+            if self._executor is None:
+                # Imported here, so runs without audio don't pay for multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                self._executor = ProcessPoolExecutor(max_workers=self.processes)
+            self._pending[path] = self._executor.submit(synthesize_clip, self.engine, voice, text, path)
+        return path
+
+    def wait(self, paths):
+        """Wait for the given clips and return those that exist"""
+        ready = []
+        for path in paths:
+            with self._lock:
+                future = self._pending.get(path)
+            if future is not None:
+                try:
+                    future.result()
+                    error = None
+                except Exception as e:
+                    error = e
+                with self._lock:
+                    # Decks sharing the synthesizer may wait for the same clip, it is counted once
+                    counted = self._pending.pop(path, None) is not None
+                    if counted and error:
+                        self.failed += 1
+                    elif counted:
+                        self.synthesized += 1
+                if counted and error:
+                    print(f"Speech synthesis error: {error}")
+            if os.path.exists(path):
+                ready.append(path)
+        return ready
+
+    def summary(self):
+        """Return a one-line summary"""
+        return f"{self.synthesized} clips synthesized, {self.failed} failed, cache: {self.cache_dir}"
+
+    def close(self):
+        """Shut down the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
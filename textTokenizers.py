@@ -0,0 +1,141 @@
+"""
+Sentence and Word Tokenizers
+
+NltkTokenizer wraps NLTK's punkt sentence tokenizer and word tokenizer.
+NLTK is only imported, and the punkt data only checked (and downloaded if
+missing), when the first text is tokenized, so importing the deck makers
+and running --help stay fast and work offline.
+
+RegexTokenizer is a pure regular expression alternative that needs no
+NLTK at all. It is less accurate with abbreviations, but fast and always
+available.
+
+Both can return word tokens with their character offsets in the sentence
+(word_spans), so callers never need to search for a word again.
+"""
+
+import re
+import threading
+
+TOKENIZER_MODES = ('nltk', 'regex')
+
+_punkt_lock = threading.Lock()
+_punkt_checked = False
+
+
+def ensure_punkt_data():
+    """Make sure the NLTK punkt data is installed, downloading it on first use"""
+    global _punkt_checked
+    with _punkt_lock:
+        if _punkt_checked:
+            return
+        import nltk
+        try:
+            nltk.data.find('tokenizers/punkt_tab')
+        except LookupError:
+            nltk.download('punkt_tab')
+        _punkt_checked = True
+
+
+class NltkTokenizer:
+    def __init__(self, lang_name):
+        self.lang_name = lang_name
+        self._punkt = None
+        self._word_tokenizer = None
+        # Tokenizers are shared by the deck threads of a batch build
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Load the punkt model for this language and the word tokenizer"""
+        with self._lock:
+            if self._punkt is not None:
+                return
+            ensure_punkt_data()
+            from nltk.tokenize import NLTKWordTokenizer
+            from nltk.tokenize.punkt import PunktTokenizer
+            punkt = PunktTokenizer(self.lang_name)
+            self._word_tokenizer = NLTKWordTokenizer()
+            # Set last: a thread seeing _punkt can use both
+            self._punkt = punkt
+
+    def sentences(self, text):
+        """Split text into sentences"""
+        try:
+            if self._punkt is None:
+                self._load()
+            return self._punkt.tokenize(text)
+        except (LookupError, OSError):
+            # No punkt model for this language: fallback to basic sentence splitting
+            return [s.strip() for s in text.split('.') if s.strip()]
+
+    def words(self, sentence):
+        """Split a sentence into word and punctuation tokens, like nltk.word_tokenize"""
+        try:
+            if self._punkt is None:
+                self._load()
+            return [token for sent in self._punkt.tokenize(sentence)
+                    for token in self._word_tokenizer.tokenize(sent)]
+        except (LookupError, OSError):
+            # Fallback to basic split if language not supported
+            return sentence.split()
+
+    def word_spans(self, sentence):
+        """Return (token, start, end) for every word token found in the sentence"""
+        return align_tokens(sentence, self.words(sentence))
+
+
+class RegexTokenizer:
+    # A sentence runs up to ., !, ? or … (plus closing quotes) followed by whitespace
+    SENTENCE = re.compile(r'\S.*?(?:[.!?…]+["»”)\]]*(?=\s|$)|\Z)', re.S)
+    WORD = re.compile(r"\w+(?:[-'’]\w+)*|[^\w\s]")
+
+    def __init__(self, lang_name=None):
+        self.lang_name = lang_name
+
+    def sentences(self, text):
+        """Split text into sentences after ., !, ? or … followed by whitespace"""
+        return [match.group(0).strip() for match in self.SENTENCE.finditer(text)]
+
+    def words(self, sentence):
+        """Split a sentence into word and punctuation tokens"""
+        return self.WORD.findall(sentence)
+
+    def word_spans(self, sentence):
+        """Return (token, start, end) for every word token of the sentence"""
+        return [(match.group(0), match.start(), match.end())
+                for match in self.WORD.finditer(sentence)]
+
+
+def align_tokens(text, tokens):
+    """Locate tokens in text, in order, and return (token, start, end) for each one found"""
+    spans = []
+    position = 0
+    for token in tokens:
+        start = text.find(token, position)
+        if start == -1:
+            # NLTK rewrites some tokens (e.g. quotes to `` and ''), skip those
+            continue
+        position = start + len(token)
+        spans.append((token, start, position))
+    return spans
+
+
+def create_tokenizer(mode, lang_name):
+    """Create a tokenizer for the given mode (nltk or regex) and NLTK language name"""
+    if mode == 'regex':
+        return RegexTokenizer(lang_name)
+    if mode == 'nltk':
+        return NltkTokenizer(lang_name)
+    raise ValueError(f"Unknown tokenizer mode: {mode} (expected one of {', '.join(TOKENIZER_MODES)})")
+
+
+# Tokenizers of worker processes, which cannot share the generator's instances
+_process_tokenizers = {}
+
+
+def process_tokenizer(mode, lang_name):
+    """Return a tokenizer cached for the lifetime of the current process"""
+    key = (mode, lang_name)
+    if key not in _process_tokenizers:
+        _process_tokenizers[key] = create_tokenizer(mode, lang_name)
+    return _process_tokenizers[key]
@@ -0,0 +1,120 @@
+"""
+Persistent Translation Cache
+
+A small SQLite backed cache shared by ankiDecksMaker.py and
+multiLanguageDecksMaker.py, so words and sentences translated in an earlier
+run are not sent to the translator again.
+
+Entries are keyed by (source language, target language, normalized text).
+When the cache grows beyond max_entries the least recently used entries
+are evicted. A cache can be shared by several translation threads.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_FILE = "translation_cache.db"
+DEFAULT_MAX_ENTRIES = 200000
+
+
+def normalize_text(text):
+    """Normalize text for use as a cache key"""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class TranslationCache:
+    def __init__(self, path=DEFAULT_CACHE_FILE, max_entries=DEFAULT_MAX_ENTRIES, flush_every=200):
+        self.path = path
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self.hits = 0
+        self.misses = 0
+        self._pending_writes = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS translations (
+                                source_lang TEXT NOT NULL,
+                                target_lang TEXT NOT NULL,
+                                text TEXT NOT NULL,
+                                translation TEXT NOT NULL,
+                                last_used REAL NOT NULL,
+                                PRIMARY KEY (source_lang, target_lang, text)
+                             )''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_translations_last_used '
+                          'ON translations (last_used)')
+        self.conn.commit()
+
+    def get(self, source_lang, target_lang, text):
+        """Return the cached translation or None"""
+        key = normalize_text(text)
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT translation FROM translations '
+                'WHERE source_lang = ? AND target_lang = ? AND text = ?',
+                (source_lang, target_lang, key)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.conn.execute(
+                'UPDATE translations SET last_used = ? '
+                'WHERE source_lang = ? AND target_lang = ? AND text = ?',
+                (time.time(), source_lang, target_lang, key))
+            self._mark_dirty()
+            return row[0]
+
+    def set(self, source_lang, target_lang, text, translation):
+        """Store a translation"""
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO translations '
+                '(source_lang, target_lang, text, translation, last_used) VALUES (?, ?, ?, ?, ?)',
+                (source_lang, target_lang, normalize_text(text), translation, time.time()))
+            self._mark_dirty()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM translations').fetchone()[0]
+
+    def _mark_dirty(self):
+        self._pending_writes += 1
+        if self._pending_writes >= self.flush_every:
+            self.flush()
+
+    def evict(self):
+        """Drop the least recently used entries beyond max_entries"""
+        if not self.max_entries:
+            return
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                'DELETE FROM translations WHERE rowid IN '
+                '(SELECT rowid FROM translations ORDER BY last_used ASC LIMIT ?)',
+                (excess,))
+
+    def flush(self):
+        """Evict old entries and commit pending writes"""
+        with self.lock:
+            self.evict()
+            self.conn.commit()
+            self._pending_writes = 0
+
+    def close(self):
+        """Flush and close the database"""
+        with self.lock:
+            self.flush()
+            self.conn.close()
+
+    def summary(self):
+        """Return a one-line hit/miss summary"""
+        total = self.hits + self.misses
+        rate = (100.0 * self.hits / total) if total else 0.0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate)"
@@ -0,0 +1,331 @@
+"""
+Translator Backends
+
+A translator backend is any object with a translate(text) method returning
+the translation of text. Backends that can translate a list of texts in one
+request also have translate_many(texts). Backends are registered in
+TRANSLATOR_BACKENDS by name; each entry takes the language pair (and
+backend options) and returns a factory, so the backend (and its imports)
+is only created on first use by LazyTranslator.
+
+LibreTranslateTranslator talks to a (self-hosted) LibreTranslate compatible
+server over a pool of persistent keep-alive connections and uses its batch
+endpoint, so many texts cost one round trip and no connection setup.
+
+DictionaryTranslator is a local, offline word dictionary. A bilingual
+tab-separated file (word<TAB>translation per line) is turned once into a
+sorted index file next to it; lookups binary search the memory-mapped
+index, so opening it is instant and it takes almost no memory however
+large the dictionary is. The index is built by sorting chunks of at most
+INDEX_CHUNK_ENTRIES entries into temporary files and merging them, so
+building it doesn't need the whole dictionary in memory either. Words missing from the dictionary, and whole
+sentences, still go to the network translator.
+"""
+
+import heapq
+import http.client
+import json
+import mmap
+import os
+import queue
+import tempfile
+import threading
+from urllib.parse import urlsplit
+
+# Suffix of the sorted index file built next to a dictionary file
+INDEX_SUFFIX = '.index'
+# Dictionary entries sorted in memory at once while building the index
+INDEX_CHUNK_ENTRIES = 500000
+
+DEFAULT_LIBRETRANSLATE_URL = 'http://localhost:5000'
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 60.0
+DEFAULT_CONCURRENCY = 4
+
+
+class LazyTranslator:
+    """Creates the real translator backend on first use"""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._backend = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        with self._lock:
+            if self._backend is None:
+                self._backend = self.factory()
+            return self._backend
+
+    def translate(self, text):
+        return self.backend.translate(text)
+
+
+class ThreadLocalTranslator:
+    """Gives every thread a backend of its own, for backends that are not thread safe"""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._local = threading.local()
+
+    def translate(self, text):
+        backend = getattr(self._local, 'backend', None)
+        if backend is None:
+            backend = self._local.backend = self.factory()
+        return backend.translate(text)
+
+
+def google_translator(source_lang, target_lang):
+    """Return a factory for deep_translator GoogleTranslators, one per thread
+
+    GoogleTranslator keeps the text of a request in its own state, so a
+    shared instance can send the text of another thread.
+    """
+    def create():
+        from deep_translator import GoogleTranslator
+        return ThreadLocalTranslator(lambda: GoogleTranslator(source=source_lang, target=target_lang))
+    return create
+
+
+class TranslationServerError(Exception):
+    pass
+
+
+class LibreTranslateTranslator:
+    def __init__(self, source_lang, target_lang, url=DEFAULT_LIBRETRANSLATE_URL, api_key=None,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 concurrency=DEFAULT_CONCURRENCY):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Invalid translation server URL: {url}")
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.api_key = api_key
+        self.connection_class = (http.client.HTTPSConnection if parts.scheme == 'https'
+                                 else http.client.HTTPConnection)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path.rstrip('/') + '/translate'
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # At most concurrency requests at a time, each on an idle pooled connection
+        self._slots = threading.BoundedSemaphore(max(1, concurrency))
+        self._idle = queue.LifoQueue()
+
+    def _connect(self):
+        conn = self.connection_class(self.host, self.port, timeout=self.connect_timeout)
+        conn.connect()
+        conn.sock.settimeout(self.read_timeout)
+        return conn
+
+    def _post(self, payload):
+        """POST a JSON payload on a pooled connection and return the decoded JSON answer"""
+        body = json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json', 'Connection': 'keep-alive'}
+        with self._slots:
+            try:
+                conn, reused = self._idle.get_nowait(), True
+            except queue.Empty:
+                conn, reused = self._connect(), False
+            while True:
+                try:
+                    conn.request('POST', self.path, body, headers)
+                    response = conn.getresponse()
+                    data = response.read()
+                    break
+                except (http.client.HTTPException, OSError) as e:
+                    conn.close()
+                    if not reused or isinstance(e, TimeoutError):
+                        raise
+                    # The server closed the idle keep-alive connection, retry on a fresh one
+                    conn, reused = self._connect(), False
+                except Exception:
+                    conn.close()
+                    raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+        try:
+            answer = json.loads(data.decode('utf-8'))
+        except ValueError:
+            answer = {}
+        if response.status != 200:
+            error = answer.get('error') if isinstance(answer, dict) else None
+            raise TranslationServerError(f"Translation server returned HTTP {response.status}: "
+                                         f"{error or response.reason}")
+        return answer
+
+    def _translate(self, q):
+        payload = {'q': q, 'source': self.source_lang, 'target': self.target_lang, 'format': 'text'}
+        if self.api_key:
+            payload['api_key'] = self.api_key
+        return self._post(payload)['translatedText']
+
+    def translate(self, text):
+        return self._translate(text)
+
+    def translate_many(self, texts):
+        """Translate a list of texts with one request to the batch endpoint"""
+        translations = self._translate(list(texts))
+        if not isinstance(translations, list) or len(translations) != len(texts):
+            raise TranslationServerError("Translation server returned a malformed batch")
+        return translations
+
+    def close(self):
+        """Close the idle pooled connections"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def libretranslate_translator(source_lang, target_lang, **options):
+    """Return a factory for a LibreTranslateTranslator (options: url, api_key, timeouts, concurrency)"""
+    def create():
+        return LibreTranslateTranslator(source_lang, target_lang, **options)
+    return create
+
+
+TRANSLATOR_BACKENDS = {
+    'google': google_translator,
+    'libretranslate': libretranslate_translator,
+}
+
+
+def create_translator(name, source_lang, target_lang, **options):
+    """Create the named translator backend (lazily) for a language pair"""
+    if name not in TRANSLATOR_BACKENDS:
+        raise ValueError(f"Unknown translator: {name} "
+                         f"(expected one of {', '.join(TRANSLATOR_BACKENDS)})")
+    return LazyTranslator(TRANSLATOR_BACKENDS[name](source_lang, target_lang, **options))
+
+
+def dictionary_key(word):
+    """Normalize a dictionary headword or a looked up word"""
+    return word.strip().lower()
+
+
+def read_dictionary_entries(path):
+    """Yield the (headword key, translation) entries of a tab-separated dictionary as bytes"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if line.startswith('#') or '\t' not in line:
+                continue
+            word, translation = line.rstrip('\r\n').split('\t')[:2]
+            key = dictionary_key(word)
+            translation = translation.strip()
+            if key and translation:
+                yield key.encode('utf-8'), translation.encode('utf-8')
+
+
+def write_sorted_run(entries):
+    """Write a chunk of entries sorted by headword to an anonymous temporary file"""
+    run = tempfile.TemporaryFile()
+    # sort() is stable, so equal headwords stay in dictionary order
+    entries.sort(key=lambda entry: entry[0])
+    for key, translation in entries:
+        run.write(key + b'\t' + translation + b'\n')
+    run.seek(0)
+    return run
+
+
+def build_dictionary_index(path, index_path):
+    """Write the entries of a tab-separated dictionary sorted by headword (first entry wins)"""
+    runs = []
+    try:
+        entries = []
+        for entry in read_dictionary_entries(path):
+            entries.append(entry)
+            if len(entries) >= INDEX_CHUNK_ENTRIES:
+                runs.append(write_sorted_run(entries))
+                entries = []
+        runs.append(write_sorted_run(entries))
+
+        # A temporary file of its own, so processes building the same index don't clash
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(index_path) + '.', suffix='.tmp',
+                                        dir=os.path.dirname(os.path.abspath(index_path)))
+        try:
+            count = 0
+            previous = None
+            with os.fdopen(fd, 'wb') as f:
+                # merge() keeps the runs' order for equal headwords, so the first entry still wins
+                for line in heapq.merge(*runs, key=lambda line: line.split(b'\t', 1)[0]):
+                    key = line.split(b'\t', 1)[0]
+                    if key != previous:
+                        f.write(line)
+                        previous = key
+                        count += 1
+            os.replace(tmp_path, index_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    finally:
+        for run in runs:
+            run.close()
+    return count
+
+
+class DictionaryTranslator:
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        # The index is (re)built only when missing or older than the dictionary
+        if (not os.path.exists(self.index_path)
+                or os.path.getmtime(self.index_path) < os.path.getmtime(path)):
+            build_dictionary_index(path, self.index_path)
+
+        self._file = open(self.index_path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._index = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def lookup(self, word):
+        """Return the translation of a word, or None when it is not in the dictionary"""
+        index = self._index
+        key = dictionary_key(word).encode('utf-8')
+        low, high = 0, len(index)
+        while low < high:
+            # Look at the line containing the middle byte
+            middle = (low + high) // 2
+            start = index.rfind(b'\n', 0, middle) + 1
+            end = index.find(b'\n', start)
+            if end == -1:
+                end = len(index)
+            tab = index.find(b'\t', start, end)
+            headword = index[start:tab]
+            if headword < key:
+                low = end + 1
+            elif headword > key:
+                high = start
+            else:
+                with self._lock:
+                    self.hits += 1
+                return index[tab + 1:end].decode('utf-8')
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def translate(self, text):
+        """Translate a single word, raising KeyError when it is not in the dictionary"""
+        translation = self.lookup(text)
+        if translation is None:
+            raise KeyError(text)
+        return translation
+
+    def summary(self):
+        """Return a one-line hit/miss summary"""
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate)"
+
+    def close(self):
+        if isinstance(self._index, mmap.mmap):
+            self._index.close()
+        self._file.close()
@@ -0,0 +1,88 @@
+"""
+Vocabulary Index
+
+Built in one pre-pass over the input: for every word it keeps how often
+it occurs and the id of the first sentence it occurs in. Words can be
+grouped under a key (e.g. their stem), in which case the index also keeps
+the forms seen for each key. The index then selects
+the vocabulary worth turning into cards: the top-N most frequent words
+with at least min_count occurrences that are not stopwords.
+"""
+
+import os
+
+
+def load_stopwords(source, lang_name):
+    """Load stopwords from a file (one word per line) or, with 'nltk', from NLTK's corpus
+
+    Raises ValueError when NLTK has no stopword list for lang_name or its lists can't be installed.
+    """
+    if not source:
+        return set()
+    if source == 'nltk' and not os.path.exists(source):
+        import nltk
+        try:
+            nltk.data.find('corpora/stopwords')
+        except LookupError:
+            if not nltk.download('stopwords'):
+                raise ValueError("--stopwords nltk: NLTK's stopword lists are not installed "
+                                 "and could not be downloaded")
+        from nltk.corpus import stopwords
+        if lang_name not in stopwords.fileids():
+            raise ValueError(f"--stopwords nltk: NLTK has no stopword list for '{lang_name}'")
+        return set(stopwords.words(lang_name))
+    with open(source, 'r', encoding='utf-8') as f:
+        return {line.strip().lower() for line in f if line.strip() and not line.startswith('#')}
+
+
+class VocabularyIndex:
+    def __init__(self):
+        # key -> [count, first sentence id]
+        self.entries = {}
+        # key -> {form: count}, only filled when words are grouped under other keys
+        self.form_counts = {}
+        self.sentences = 0
+
+    def add_sentence(self, sentence_id, words, keys=None):
+        """Count the (cleaned) words of one sentence, optionally grouped under keys"""
+        self.sentences += 1
+        for word, key in zip(words, keys or words):
+            if keys is not None:
+                forms = self.form_counts.setdefault(key, {})
+                forms[word] = forms.get(word, 0) + 1
+            entry = self.entries.get(key)
+            if entry is None:
+                self.entries[key] = [1, sentence_id]
+            else:
+                entry[0] += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def first_sentence(self, word):
+        return self.entries[word][1]
+
+    def forms(self, key):
+        """Return the forms seen for a key, most frequent first"""
+        forms = self.form_counts.get(key)
+        if not forms:
+            return [key] if key in self.entries else []
+        return sorted(forms, key=lambda form: -forms[form])
+
+    def ranked(self):
+        """Return all words, most frequent first (ties in order of first occurrence)"""
+        return sorted(self.entries, key=lambda word: (-self.entries[word][0], self.entries[word][1]))
+
+    def select(self, top_n=None, min_count=1, stopwords=(), exclude=()):
+        """Return the set of words worth learning"""
+        selected = set()
+        for word in self.ranked():
+            if self.entries[word][0] < min_count:
+                # Ranked by count, so every following word is rarer
+                break
+            if word in stopwords or word in exclude:
+                continue
+            selected.add(word)
+            if top_n and len(selected) >= top_n:
+                break
+        return selected